@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Iterable, Optional
+
+DEFAULT_BUNDLE_CACHE_MAX_SIZE: int = 512 * 1024 * 1024
+
+
+class BundleCache:
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_BUNDLE_CACHE_MAX_SIZE):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_path(env: str) -> str:
+        return os.path.join('.bundle_cache', env)
+
+    @staticmethod
+    def key(parts: Iterable[str]) -> str:
+        digest = hashlib.sha256()
+        for part in sorted(parts):
+            digest.update(f"{part}\n".encode('UTF-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.zip")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path: str = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data: bytes = f.read()
+        except FileNotFoundError:
+            return None
+        # mtime is the recency used by the eviction, atime is not reliable on most mounts
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path: str = self._path(key)
+        tmp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, str]] = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.zip') or not entry.is_file():
+                    continue
+                # another worker may evict the same file between the scan and the stat
+                try:
+                    stat: os.stat_result = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size: int = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total_size -= size
+            logging.info(f"Bundle cache. {os.path.basename(path)} has been evicted")
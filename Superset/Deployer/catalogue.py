@@ -0,0 +1,194 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from bidict import bidict
+from Deployer.uuid_registry import OBJECT_CLASSES
+from SupersetApiClient import yaml_codec
+
+
+@dataclass(slots=True)
+class CatalogueEntry:
+    object_class: str
+    deploy_name: str
+    path: str
+    mtime_ns: int
+    size: int
+    name: Optional[str] = None
+    uuid: Optional[str] = None
+    dependencies: list[tuple[str, str]] = field(default_factory=list)
+    sql_path: Optional[str] = None
+    sql_mtime_ns: Optional[int] = None
+    content_hash: Optional[str] = None
+    document: Optional[dict[str, any]] = field(default=None, repr=False, compare=False)
+
+    def header(self) -> dict[str, any]:
+        return dict(mtime_ns=self.mtime_ns, size=self.size, name=self.name, uuid=self.uuid,
+                    dependencies=self.dependencies, sql_mtime_ns=self.sql_mtime_ns, content_hash=self.content_hash)
+
+
+def content_hash(obj_yaml: dict[str, any], sql: Optional[str] = None) -> str:
+    # hash of the parsed document, so formatting-only edits of the yaml do not count as changes
+    digest = hashlib.sha256(json.dumps(obj_yaml, sort_keys=True, ensure_ascii=False, default=str).encode('UTF-8'))
+    if sql is not None:
+        digest.update(sql.encode('UTF-8'))
+    return digest.hexdigest()
+
+
+def object_dependencies(object_class: str, obj_yaml: dict[str, any]) -> list[tuple[str, str]]:
+    dependencies: list[tuple[str, str]] = []
+    if object_class == 'datasets' and obj_yaml.get('_deploy_database_name'):
+        dependencies.append(('databases', obj_yaml['_deploy_database_name']))
+    elif object_class == 'charts' and obj_yaml.get('_deploy_dataset_name'):
+        dependencies.append(('datasets', obj_yaml['_deploy_dataset_name']))
+    elif object_class == 'dashboards':
+        for dash_filter in (obj_yaml.get('metadata') or {}).get('native_filter_configuration', []):
+            for target in dash_filter.get('targets', []):
+                if target.get('_deploy_dataset_name'):
+                    dependencies.append(('datasets', target['_deploy_dataset_name']))
+        for pos_key, pos_val in (obj_yaml.get('position') or {}).items():
+            if type(pos_val) is dict and pos_key.lower().startswith('chart') \
+                    and 'uuid' in (pos_val.get('meta') or {}) \
+                    and '_deploy_chart_name' in pos_val['meta']:
+                dependencies.append(('charts', pos_val['meta']['_deploy_chart_name']))
+    return list(dict.fromkeys(dependencies))
+
+
+class DeployCatalogue:
+    def __init__(self, deploy_path: str, name_fields: dict[str, str], persist_path: str = None):
+        self.deploy_path = deploy_path
+        self.name_fields = name_fields
+        self.persist_path = persist_path
+        self.entries: dict[str, dict[str, CatalogueEntry]] = {object_class: {} for object_class in OBJECT_CLASSES}
+        self._scanned: bool = False
+        self._lock = threading.Lock()
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    @staticmethod
+    def catalogue_path(deploy_path: str) -> str:
+        return f"{os.path.normpath(deploy_path)}.catalogue.json"
+
+    def _object_path(self, object_class: str, deploy_name: str) -> str:
+        return os.path.join(self.deploy_path, object_class, f"{deploy_name}.yaml")
+
+    def _load(self) -> None:
+        with open(self.persist_path, 'r', encoding='UTF-8') as f:
+            objects: dict[str, dict[str, dict[str, any]]] = json.load(f).get('objects', {})
+        for object_class, headers in objects.items():
+            if object_class not in self.entries:
+                continue
+            for deploy_name, header in headers.items():
+                self.entries[object_class][deploy_name] = CatalogueEntry(
+                    object_class, deploy_name, self._object_path(object_class, deploy_name),
+                    header['mtime_ns'], header['size'], header.get('name'), header.get('uuid'),
+                    [tuple(dep) for dep in header.get('dependencies', [])],
+                    sql_mtime_ns=header.get('sql_mtime_ns'), content_hash=header.get('content_hash')
+                )
+
+    def save(self) -> None:
+        tmp_path: str = f"{self.persist_path}.tmp"
+        with open(tmp_path, 'w', encoding='UTF-8') as f:
+            json.dump({'objects': {object_class: {deploy_name: entry.header() for deploy_name, entry in entries.items()}
+                                   for object_class, entries in self.entries.items()}},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.persist_path)
+
+    def _read_entry(self,
+                    object_class: str,
+                    deploy_name: str,
+                    path: str,
+                    stat: os.stat_result,
+                    sql_path: Optional[str],
+                    sql_mtime_ns: Optional[int]
+                    ) -> CatalogueEntry:
+        with open(path, 'r', encoding='UTF-8') as f:
+            obj_yaml: dict[str, any] = yaml_codec.load(f) or {}
+        sql: Optional[str] = None
+        if sql_path:
+            with open(sql_path, 'r', encoding='UTF-8') as f:
+                sql = f.read()
+        return CatalogueEntry(object_class, deploy_name, path, stat.st_mtime_ns, stat.st_size,
+                              obj_yaml.get(self.name_fields[object_class]), obj_yaml.get('uuid'),
+                              object_dependencies(object_class, obj_yaml), sql_path, sql_mtime_ns,
+                              content_hash(obj_yaml, sql), document=obj_yaml)
+
+    def refresh(self) -> None:
+        # only files whose mtime or size changed since the last scan are parsed again
+        with self._lock:
+            changed: bool = False
+            for object_class in OBJECT_CLASSES:
+                objects_dir: str = os.path.join(self.deploy_path, object_class)
+                current: dict[str, CatalogueEntry] = self.entries[object_class]
+                entries: dict[str, CatalogueEntry] = {}
+                if os.path.isdir(objects_dir):
+                    with os.scandir(objects_dir) as it:
+                        dir_entries: dict[str, os.DirEntry] = {dir_entry.name: dir_entry for dir_entry in it
+                                                               if dir_entry.is_file()}
+                    for file_name, dir_entry in dir_entries.items():
+                        if not file_name.endswith('.yaml'):
+                            continue
+                        deploy_name: str = file_name[:-len('.yaml')]
+                        stat: os.stat_result = dir_entry.stat()
+                        sql_entry: Optional[os.DirEntry] = dir_entries.get(f"{deploy_name}.sql")
+                        sql_mtime_ns: Optional[int] = sql_entry.stat().st_mtime_ns if sql_entry else None
+                        entry: CatalogueEntry = current.get(deploy_name)
+                        if entry is None or entry.content_hash is None or entry.mtime_ns != stat.st_mtime_ns \
+                                or entry.size != stat.st_size or entry.sql_mtime_ns != sql_mtime_ns:
+                            entry = self._read_entry(object_class, deploy_name, dir_entry.path, stat,
+                                                     sql_entry.path if sql_entry else None, sql_mtime_ns)
+                            changed = True
+                        entry.sql_path = sql_entry.path if sql_entry else None
+                        entries[deploy_name] = entry
+                changed = changed or entries.keys() != current.keys()
+                self.entries[object_class] = entries
+            self._scanned = True
+            if changed and self.persist_path:
+                self.save()
+
+    def get(self, object_class: str, deploy_name: str) -> Optional[CatalogueEntry]:
+        if not self._scanned:
+            self.refresh()
+        return self.entries[object_class].get(deploy_name)
+
+    def names(self, object_class: str) -> list[str]:
+        if not self._scanned:
+            self.refresh()
+        return [entry.name for _, entry in sorted(self.entries[object_class].items()) if entry.name]
+
+    def dependencies(self, object_class: str, deploy_name: str) -> list[tuple[str, str]]:
+        entry: Optional[CatalogueEntry] = self.get(object_class, deploy_name)
+        return list(entry.dependencies) if entry else []
+
+    def document(self, object_class: str, deploy_name: str) -> Optional[dict[str, any]]:
+        entry: Optional[CatalogueEntry] = self.get(object_class, deploy_name)
+        if entry is None:
+            return None
+        if entry.document is None:
+            with open(entry.path, 'r', encoding='UTF-8') as f:
+                entry.document = yaml_codec.load(f) or {}
+        # callers rewrite uuids and drop deploy-only keys, so the cached document must stay untouched
+        return copy.deepcopy(entry.document)
+
+    def closure(self, nodes: Iterable[tuple[str, str]]) -> set[tuple[str, str]]:
+        closure: set[tuple[str, str]] = set()
+        stack: list[tuple[str, str]] = list(nodes)
+        while stack:
+            node: tuple[str, str] = stack.pop()
+            if node not in closure:
+                closure.add(node)
+                stack.extend(self.dependencies(*node))
+        return closure
+
+    def effective_uuid(self, object_class: str, deploy_name: str, uuid_map: dict[str, bidict]) -> Optional[str]:
+        # the uuid the import builder will write: the one registered for the environment or the local one
+        entry: Optional[CatalogueEntry] = self.get(object_class, deploy_name)
+        return uuid_map[object_class].inverse.get(deploy_name) or (entry.uuid if entry else None)
+
+    def signature(self, object_class: str, deploy_name: str, uuid_map: dict[str, bidict]) -> str:
+        entry: Optional[CatalogueEntry] = self.get(object_class, deploy_name)
+        return f"{object_class}/{deploy_name}/{self.effective_uuid(object_class, deploy_name, uuid_map)}/" \
+               f"{entry.content_hash if entry else None}"
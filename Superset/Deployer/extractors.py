@@ -1,20 +1,31 @@
 from __future__ import annotations
-import io
+import contextlib
 import os
 import zipfile
 import logging
-import yaml
 from bidict import bidict
-from typing import TYPE_CHECKING
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import BinaryIO, Callable, Iterable, NamedTuple, Optional, TYPE_CHECKING
+from Deployer.manifest import ExtractManifest
+from SupersetApiClient import yaml_codec
 
 if TYPE_CHECKING:
     from Deployer.superset_deployer import SupersetDeployer
+    from SupersetApiClient.api_object import ApiObject
 
 
 class SupersetObjectExtractor:
+    DEPENDENCY_CLASSES: dict[str, tuple[str, ...]] = {
+        'databases': (),
+        'datasets': ('databases',),
+        'charts': ('datasets', 'databases'),
+        'dashboards': ('charts', 'datasets', 'databases'),
+    }
 
     def __init__(self, deployer: SupersetDeployer):
         self.deployer = deployer
+        self.manifest = ExtractManifest(ExtractManifest.manifest_path(self.deployer.config['deploy_path']))
         self._reset_uuid_map()
 
     def _reset_uuid_map(self):
@@ -42,138 +53,312 @@ class SupersetObjectExtractor:
                        only_build_uuid_map: bool = False
                        ) -> None:
         self._reset_uuid_map()
-        objects: list = getattr(self.deployer.api_client, object_class).find_by_name(name=object_name)
-        if objects:
-            obj = max(objects, key=lambda el: el.id)
-        else:
-            if only_build_uuid_map:
-                return
-            raise Exception(f"{object_class} object named {object_name} not found")
-        zip_buffer: io.BytesIO = obj.export_to_buffer()
+        api_object: ApiObject = getattr(self.deployer.api_client, object_class)
+        # a registered uuid identifies the object directly, a title can be shared by several objects
+        registered_uuid: Optional[str] = self.deployer.uuid_registry.uuid_for(
+            object_class, self.deployer.get_deploy_object_name(object_name)
+        )
+        obj_id: Optional[int] = api_object.id_for_uuid(registered_uuid) if registered_uuid else None
+        if obj_id is None:
+            objects: list = api_object.find_by_name(name=object_name, columns=['id'])
+            if objects:
+                obj_id = max(objects, key=lambda el: el.id).id
+            else:
+                if only_build_uuid_map:
+                    return
+                raise Exception(f"{object_class} object named {object_name} not found")
+        zip_buffer: BinaryIO = api_object.export_to_spooled_file([obj_id])
+        with zip_buffer:
+            self._extract_zip(zip_buffer, only_build_uuid_map)
+
+    def build_uuid_map(self, object_class: str, ids: list[int]) -> None:
+        self._reset_uuid_map()
+        api_object: ApiObject = getattr(self.deployer.api_client, object_class)
+        with api_object.export_bulk(ids) as zip_buffer:
+            self._extract_zip(zip_buffer, True)
+
+    def extract_all(self, object_class: str = 'dashboards', force: bool = False) -> None:
+        self._reset_uuid_map()
+        api_object: ApiObject = getattr(self.deployer.api_client, object_class)
+        name_field: str = api_object.data_model.name_field()
+        latest: dict[str, dict[str, any]] = {}
+        listed_count: int = 0
+        for obj in api_object.list_all(columns=['id', name_field, 'changed_on_utc']):
+            listed_count += 1
+            obj_name: str = self.deployer.get_deploy_object_name(obj[name_field])
+            # objects sharing a deploy name are extracted to the same file, the latest one wins
+            if obj_name not in latest or obj['id'] > latest[obj_name]['id']:
+                latest[obj_name] = obj
+        changed_on: dict[int, tuple[str, str]] = {obj['id']: (obj_name, obj.get('changed_on_utc'))
+                                                  for obj_name, obj in latest.items()}
+        if len(changed_on) < listed_count:
+            logging.warning(f"Extract all {object_class}. {listed_count - len(changed_on)} objects share a name "
+                            f"with a newer one and are skipped")
+        # an edit of a chart, dataset or database does not move the changed_on of the objects using it
+        remote_changed_on: dict[str, dict[str, str]] = {
+            dep_class: {obj['uuid']: obj.get('changed_on_utc') for obj in getattr(
+                self.deployer.api_client, dep_class).list_all(columns=['id', 'uuid', 'changed_on_utc'])}
+            for dep_class in self.DEPENDENCY_CLASSES[object_class]
+        }
+        ids: list[int] = [
+            obj_id for obj_id, (obj_name, obj_changed_on) in changed_on.items()
+            if force or not self.manifest.is_unchanged(object_class, obj_name, obj_changed_on,
+                                                       self.deployer.config['deploy_path'], remote_changed_on)
+        ]
+        if not ids:
+            logging.info(f"Extract all {object_class}. Nothing changed since the last extraction")
+            return
+        logging.info(f"Extract all {object_class}. Exporting {len(ids)} of {listed_count} objects")
+        with api_object.export_bulk(ids) as zip_buffer:
+            self._extract_zip(zip_buffer)
+        for obj_id in ids:
+            self.manifest.set_changed_on(object_class, *changed_on[obj_id])
+        # only the dependencies extracted by this run get the changed_on listed before the export
+        for dep_class, dep_changed_on in remote_changed_on.items():
+            for uuid, deploy_name in self.uuid_map[dep_class].items():
+                self.manifest.set_changed_on(dep_class, deploy_name, dep_changed_on.get(uuid))
+        self.manifest.save()
+
+    def _extract_zip(self, zip_buffer: BinaryIO, only_build_uuid_map: bool = False) -> None:
         with zipfile.ZipFile(zip_buffer, 'r') as obj_zip:
             files: dict[str, any] = self._get_files_from_zip(obj_zip)
-            obj_zip_extractor: ObjectZipExtractor = ObjectZipExtractor(self, obj_zip, only_build_uuid_map)
-            # databases processing
-            for db_filename, db_path in files['databases'].items():
-                obj_zip_extractor.extract_database(db_path)
-            # datasets processing
-            for db_name, ds_dict in files['datasets'].items():
-                for ds_filename, ds_path in ds_dict.items():
-                    obj_zip_extractor.extract_dataset(ds_path)
-            # charts processing
-            for chart_filename, chart_path in files['charts'].items():
-                obj_zip_extractor.extract_chart(chart_path)
-            # dashboards processing
-            for dash_filename, dash_path in files['dashboards'].items():
-                obj_zip_extractor.extract_dashboard(dash_path)
+            members_count: int = len(obj_zip.filelist)
+            workers: int = min(self.deployer.config.get('extract_workers') or os.cpu_count(), os.cpu_count())
+            with ProcessPoolExecutor(max_workers=workers) \
+                    if workers > 1 and members_count >= ObjectZipExtractor.PARALLEL_MIN_MEMBERS \
+                    else contextlib.nullcontext() as executor:
+                obj_zip_extractor: ObjectZipExtractor = ObjectZipExtractor(self, obj_zip, only_build_uuid_map,
+                                                                           executor, workers)
+                # stages run in dependency order: every stage needs the uuid map of the previous ones
+                obj_zip_extractor.extract_members('databases', files['databases'].values())
+                obj_zip_extractor.extract_members(
+                    'datasets', [ds_path for ds_dict in files['datasets'].values() for ds_path in ds_dict.values()]
+                )
+                obj_zip_extractor.extract_members('charts', files['charts'].values())
+                obj_zip_extractor.extract_members('dashboards', files['dashboards'].values())
+        self.deployer.uuid_registry.update(self.uuid_map)
+        if not only_build_uuid_map:
+            self.manifest.save()
+
+
+class ExtractedObject(NamedTuple):
+    uuid: str
+    deploy_name: str
+    files: dict[str, bytes]
+    dependencies: tuple[tuple[str, str], ...] = ()
+
+
+def _fixed_name(deploy_name: str, src_object_name: str) -> str:
+    return deploy_name
+
+
+def _dump_yaml(obj_yaml: dict[str, any]) -> bytes:
+    return yaml_codec.dump(obj_yaml, allow_unicode=True, encoding='UTF-8')
+
+
+# Transformations of zip members run in worker processes, so they are module-level functions
+# that only see the member bytes and the uuid maps built by the previous stages
+
+def transform_database(name_func: Callable[[str], str],
+                       only_build_uuid_map: bool,
+                       data: bytes
+                       ) -> ExtractedObject:
+    db_yaml: dict[str, any] = yaml_codec.load(data)
+    db_name: str = name_func(db_yaml['database_name'])
+    files: dict[str, bytes] = {}
+    if not only_build_uuid_map:
+        files[f"{db_name}.yaml"] = _dump_yaml(db_yaml)
+    return ExtractedObject(db_yaml['uuid'], db_name, files)
+
+
+def transform_dataset(name_func: Callable[[str], str],
+                      only_build_uuid_map: bool,
+                      data: bytes,
+                      databases: dict[str, str]
+                      ) -> ExtractedObject:
+    ds_yaml: dict[str, any] = yaml_codec.load(data)
+    ds_name: str = name_func(ds_yaml['table_name'])
+    files: dict[str, bytes] = {}
+    if not only_build_uuid_map:
+        if ds_yaml.get('sql'):
+            sql_file_name: str = f"{ds_name}.sql"
+            files[sql_file_name] = ds_yaml['sql'].encode('UTF-8')
+            ds_yaml['sql'] = f'#file:{sql_file_name}#'
+        ds_yaml['_deploy_database_name'] = databases[ds_yaml['database_uuid']]
+        files[f"{ds_name}.yaml"] = _dump_yaml(ds_yaml)
+        return ExtractedObject(ds_yaml['uuid'], ds_name, files, (('databases', ds_yaml['_deploy_database_name']),))
+    return ExtractedObject(ds_yaml['uuid'], ds_name, files)
+
+
+def transform_chart(name_func: Callable[[str], str],
+                    only_build_uuid_map: bool,
+                    data: bytes,
+                    datasets: dict[str, str]
+                    ) -> Optional[ExtractedObject]:
+    chart_yaml: dict[str, any] = yaml_codec.load(data)
+
+    if 'dataset_uuid' not in chart_yaml:
+        logging.warning(f"Chart {chart_yaml['slice_name']} without dataset, skipping")
+        return None
+
+    chart_name: str = name_func(chart_yaml['slice_name'])
+    files: dict[str, bytes] = {}
+    if not only_build_uuid_map:
+        chart_yaml['_deploy_dataset_name'] = datasets[chart_yaml['dataset_uuid']]
+        files[f"{chart_name}.yaml"] = _dump_yaml(chart_yaml)
+        return ExtractedObject(chart_yaml['uuid'], chart_name, files,
+                               (('datasets', chart_yaml['_deploy_dataset_name']),))
+    return ExtractedObject(chart_yaml['uuid'], chart_name, files)
+
+
+def transform_dashboard(name_func: Callable[[str], str],
+                        only_build_uuid_map: bool,
+                        data: bytes,
+                        datasets: dict[str, str],
+                        charts: dict[str, str]
+                        ) -> ExtractedObject:
+    dash_yaml: dict[str, any] = yaml_codec.load(data)
+    dash_name: str = name_func(dash_yaml['dashboard_title'])
+    files: dict[str, bytes] = {}
+    dependencies: list[tuple[str, str]] = []
+    if not only_build_uuid_map:
+        if 'metadata' in dash_yaml and 'native_filter_configuration' in dash_yaml['metadata']:
+            for dash_filter in dash_yaml['metadata']['native_filter_configuration']:
+                if 'targets' in dash_filter:
+                    for target in dash_filter['targets']:
+                        if 'datasetUuid' in target:
+                            if target['datasetUuid'] not in datasets:
+                                logging.warning(
+                                    f"Dashboard {dash_name} has incorrect link to dataset, skipping"
+                                )
+                                continue
+                            target['_deploy_dataset_name'] = datasets[target['datasetUuid']]
+                            dependencies.append(('datasets', target['_deploy_dataset_name']))
+
+        charts_to_delete: list[str] = []
+
+        for pos_key, pos_val in dash_yaml['position'].items():
+            if type(pos_val) is dict and pos_key.lower().startswith('chart'):
+                chart_uuid: str = pos_val['meta'].get('uuid')
+                if chart_uuid not in charts:
+                    charts_to_delete.append(pos_key)
+                    continue
+                pos_val['meta']['_deploy_chart_name'] = charts[pos_val['meta']['uuid']]
+                dependencies.append(('charts', pos_val['meta']['_deploy_chart_name']))
+
+        for chart_key in charts_to_delete:
+            dash_yaml['position'].pop(chart_key)
+
+        if 'slug' in dash_yaml and not dash_yaml['slug']:
+            dash_yaml['slug'] = dash_name
+
+        files[f"{dash_name}.yaml"] = _dump_yaml(dash_yaml)
+    return ExtractedObject(dash_yaml['uuid'], dash_name, files, tuple(dict.fromkeys(dependencies)))
 
 
 class ObjectZipExtractor:
+    PARALLEL_MIN_MEMBERS: int = 64
+    TRANSFORMS: dict[str, Callable[..., Optional[ExtractedObject]]] = {
+        'databases': transform_database,
+        'datasets': transform_dataset,
+        'charts': transform_chart,
+        'dashboards': transform_dashboard,
+    }
+    # uuid maps of the previous stages passed to each transformation
+    STAGE_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+        'databases': (),
+        'datasets': ('databases',),
+        'charts': ('datasets',),
+        'dashboards': ('datasets', 'charts'),
+    }
+
     def __init__(self,
                  ss_extractor: SupersetObjectExtractor,
                  object_zip: zipfile.ZipFile,
-                 only_build_uuid_map: bool = False
+                 only_build_uuid_map: bool = False,
+                 executor: Executor = None,
+                 workers: int = 1
                  ):
         self.ss_extractor = ss_extractor
         self.object_zip = object_zip
         self.only_build_uuid_map = only_build_uuid_map
+        self.executor = executor
+        self.workers = workers
         self.deployer = self.ss_extractor.deployer
+        self.manifest = self.ss_extractor.manifest
 
-    def extract_database(self, file_path: str) -> None:
-        extract_dir: str = self.deployer.object_path('databases')
-        if not self.only_build_uuid_map and not os.path.exists(extract_dir):
+    def _save_object(self, object_class: str, extracted: Optional[ExtractedObject]) -> None:
+        if extracted is None:
+            return
+        self.ss_extractor.uuid_map[object_class][extracted.uuid] = extracted.deploy_name
+        if self.only_build_uuid_map:
+            return
+        extract_dir: str = self.deployer.object_path(object_class)
+        if not os.path.exists(extract_dir):
             os.mkdir(extract_dir)
-            logging.info(f"Extract database. Directory {extract_dir} has been created")
-
-        with self.object_zip.open(file_path, 'r') as db_file:
-            db_yaml: dict[str, any] = yaml.safe_load(db_file)
-            db_name: str = self.deployer.get_deploy_object_name(db_yaml['database_name'])
-            self.ss_extractor.uuid_map['databases'][db_yaml['uuid']] = db_name
-            if not self.only_build_uuid_map:
-                with open(os.path.join(extract_dir, f"{db_name}.yaml"), 'wb') as db_new_file:
-                    db_new_file.write(yaml.dump(db_yaml, allow_unicode=True, encoding='UTF-8'))
+            logging.info(f"Extract {object_class[:-1]}. Directory {extract_dir} has been created")
+        for file_name, data in extracted.files.items():
+            self.manifest.write(object_class, extracted.deploy_name, os.path.join(extract_dir, file_name), data,
+                                extracted.uuid)
+        self.manifest.set_dependencies(object_class, extracted.deploy_name, list(extracted.dependencies))
 
-    def extract_dataset(self, file_path: str) -> None:
-        extract_dir: str = self.deployer.object_path('datasets')
-        if not self.only_build_uuid_map and not os.path.exists(extract_dir):
-            os.mkdir(extract_dir)
-            logging.info(f"Extract dataset. Directory {extract_dir} has been created")
-
-        with self.object_zip.open(file_path, 'r') as ds_file:
-            ds_yaml: dict[str, any] = yaml.safe_load(ds_file)
-            ds_name: str = self.deployer.get_deploy_object_name(ds_yaml['table_name'])
-            self.ss_extractor.uuid_map['datasets'][ds_yaml['uuid']] = ds_name
-            if not self.only_build_uuid_map:
-                if ds_yaml.get('sql'):
-                    sql_file_name: str = f"{ds_name}.sql"
-                    with open(os.path.join(extract_dir, sql_file_name), 'w', encoding='UTF-8') as ds_sql:
-                        ds_sql.write(ds_yaml['sql'])
-                    ds_yaml['sql'] = f'#file:{sql_file_name}#'
-                with open(os.path.join(extract_dir, f"{ds_name}.yaml"), 'wb') as ds_new_file:
-                    ds_yaml['_deploy_database_name'] = self.ss_extractor.uuid_map['databases'][ds_yaml['database_uuid']]
-                    ds_new_file.write(yaml.dump(ds_yaml, allow_unicode=True, encoding='UTF-8'))
+    def extract_members(self, object_class: str, file_paths: Iterable[str]) -> None:
+        file_paths = sorted(file_paths)
+        if not file_paths:
+            return
+        dependency_maps: dict[str, dict[str, str]] = {dep: dict(self.ss_extractor.uuid_map[dep])
+                                                      for dep in self.STAGE_DEPENDENCIES[object_class]}
+        transform: Callable[[bytes], Optional[ExtractedObject]] = partial(
+            self.TRANSFORMS[object_class],
+            self.deployer.get_deploy_object_name,
+            self.only_build_uuid_map,
+            **dependency_maps
+        )
+        members: list[bytes] = [self.object_zip.read(file_path) for file_path in file_paths]
+        if self.executor is not None:
+            chunk_size: int = max(1, len(members) // (4 * self.workers))
+            extracted_objects: list[Optional[ExtractedObject]] = list(
+                self.executor.map(transform, members, chunksize=chunk_size)
+            )
+        else:
+            extracted_objects: list[Optional[ExtractedObject]] = list(map(transform, members))
+        unique_names: dict[str, str] = self._unique_names(extracted_objects)
+        # results come back in input order, so files are written deterministically
+        for data, extracted in zip(members, extracted_objects):
+            if extracted is not None and extracted.uuid in unique_names:
+                logging.warning(f"Extract {object_class[:-1]}. {extracted.deploy_name} ({extracted.uuid}) shares its "
+                                f"name with another {object_class[:-1]}, extracted as {unique_names[extracted.uuid]}")
+                extracted = self.TRANSFORMS[object_class](partial(_fixed_name, unique_names[extracted.uuid]),
+                                                          self.only_build_uuid_map, data, **dependency_maps)
+            self._save_object(object_class, extracted)
 
-    def extract_chart(self, file_path: str) -> None:
-        extract_dir: str = self.deployer.object_path('charts')
-        if not self.only_build_uuid_map and not os.path.exists(extract_dir):
-            os.mkdir(extract_dir)
-            logging.info(f"Extract chart. Directory {extract_dir} has been created")
+    @staticmethod
+    def _unique_names(extracted_objects: list[Optional[ExtractedObject]]) -> dict[str, str]:
+        # distinct objects sharing a deploy name are kept apart: the lowest uuid keeps the name and the others
+        # get a uuid suffix, so the names do not depend on the ids of an environment
+        uuids_by_name: dict[str, set[str]] = {}
+        for extracted in extracted_objects:
+            if extracted is not None:
+                uuids_by_name.setdefault(extracted.deploy_name, set()).add(extracted.uuid)
+        taken_names: set[str] = set(uuids_by_name)
+        unique_names: dict[str, str] = {}
+        for deploy_name, uuids in uuids_by_name.items():
+            for uuid in sorted(uuids)[1:]:
+                unique_name: str = f"{deploy_name}_{uuid[:8]}"
+                if unique_name in taken_names:
+                    unique_name = f"{deploy_name}_{uuid}"
+                taken_names.add(unique_name)
+                unique_names[uuid] = unique_name
+        return unique_names
 
-        with self.object_zip.open(file_path, 'r') as chart_file:
-            chart_yaml: dict[str, any] = yaml.safe_load(chart_file)
+    def extract_database(self, file_path: str) -> None:
+        self.extract_members('databases', [file_path])
 
-            if 'dataset_uuid' not in chart_yaml:
-                logging.warning(f"Chart {chart_yaml['slice_name']} without dataset, skipping")
-                return None
+    def extract_dataset(self, file_path: str) -> None:
+        self.extract_members('datasets', [file_path])
 
-            chart_name: str = self.deployer.get_deploy_object_name(chart_yaml['slice_name'])
-            self.ss_extractor.uuid_map['charts'][chart_yaml['uuid']] = chart_name
-            if not self.only_build_uuid_map:
-                with open(os.path.join(extract_dir, f"{chart_name}.yaml"), 'wb') as chart_new_file:
-                    chart_yaml['_deploy_dataset_name'] = self.ss_extractor.uuid_map['datasets'][
-                        chart_yaml['dataset_uuid']]
-                    chart_new_file.write(yaml.dump(chart_yaml, allow_unicode=True, encoding='UTF-8'))
+    def extract_chart(self, file_path: str) -> None:
+        self.extract_members('charts', [file_path])
 
     def extract_dashboard(self, file_path: str) -> None:
-        extract_dir: str = self.deployer.object_path('dashboards')
-        if not self.only_build_uuid_map and not os.path.exists(extract_dir):
-            os.mkdir(extract_dir)
-            logging.info(f"Extract dashboard. Directory {extract_dir} has been created")
-
-        with self.object_zip.open(file_path, 'r') as dash_file:
-            dash_yaml: dict[str, any] = yaml.safe_load(dash_file)
-            dash_name: str = self.deployer.get_deploy_object_name(dash_yaml['dashboard_title'])
-            self.ss_extractor.uuid_map['dashboards'][dash_yaml['uuid']] = dash_name
-            if not self.only_build_uuid_map:
-                if 'metadata' in dash_yaml and 'native_filter_configuration' in dash_yaml['metadata']:
-                    for dash_filter in dash_yaml['metadata']['native_filter_configuration']:
-                        if 'targets' in dash_filter:
-                            for target in dash_filter['targets']:
-                                if 'datasetUuid' in target:
-                                    if target['datasetUuid'] not in self.ss_extractor.uuid_map['datasets']:
-                                        logging.warning(
-                                            f"Dashboard {dash_name} has incorrect link to dataset, skipping"
-                                        )
-                                        continue
-                                    target['_deploy_dataset_name'] = self.ss_extractor.uuid_map['datasets'][
-                                        target['datasetUuid']]
-
-                charts_to_delete: list[str] = []
-
-                for pos_key, pos_val in dash_yaml['position'].items():
-                    if type(pos_val) is dict and pos_key.lower().startswith('chart'):
-                        chart_uuid: str = pos_val['meta'].get('uuid')
-                        if chart_uuid not in self.ss_extractor.uuid_map['charts']:
-                            charts_to_delete.append(pos_key)
-                            continue
-                        pos_val['meta']['_deploy_chart_name'] = \
-                            self.ss_extractor.uuid_map['charts'][pos_val['meta']['uuid']]
-
-                for chart_key in charts_to_delete:
-                    dash_yaml['position'].pop(chart_key)
-
-                if 'slug' in dash_yaml and not dash_yaml['slug']:
-                    dash_yaml['slug'] = dash_name
-
-                with open(os.path.join(extract_dir, f"{dash_name}.yaml"), 'wb') as dash_new_file:
-                    dash_new_file.write(yaml.dump(dash_yaml, allow_unicode=True, encoding='UTF-8'))
+        self.extract_members('dashboards', [file_path])
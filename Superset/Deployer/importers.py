@@ -1,15 +1,21 @@
 from __future__ import annotations
+import io
+import logging
 import os
 import zipfile
 from datetime import datetime
-from typing import Union
-import yaml
+from bidict import bidict
+from Deployer.bundle_cache import DEFAULT_BUNDLE_CACHE_MAX_SIZE, BundleCache
+from Deployer.uuid_registry import OBJECT_CLASSES, UuidRegistry
+from SupersetApiClient import yaml_codec
 from SupersetApiClient.api_object import ApiObject
 from typing import TYPE_CHECKING
 
 from SupersetApiClient.dashboards import Dashboard
 
 if TYPE_CHECKING:
+    from Deployer.catalogue import DeployCatalogue
+    from Deployer.scheduler import TokenBucket
     from Deployer.superset_deployer import SupersetDeployer
 
 
@@ -23,6 +29,10 @@ class SupersetObjectImporter:
 
     def __init__(self, deployer: SupersetDeployer):
         self.deployer = deployer
+        self.bundle_cache = BundleCache(
+            BundleCache.cache_path(self.deployer.env),
+            (self.deployer.config.get('bundle_cache_max_mb') or 0) * 1024 * 1024 or DEFAULT_BUNDLE_CACHE_MAX_SIZE
+        )
 
     def _get_object_map(self, object_class: str) -> dict[str, str]:
         dict_res: dict[str, str] = {object_class: SupersetObjectImporter.SS_OBJECTS_MAP[object_class]['ss_type']}
@@ -38,176 +48,332 @@ class SupersetObjectImporter:
             child_obj_class = SupersetObjectImporter.SS_OBJECTS_MAP[child_obj_class].get('child_object_class')
         return dict_res
 
-    @staticmethod
-    def _update_zip_file(zip_path: str, filename: str, data: Union[str, bytes]) -> None:
-        zip_dirname: str = os.path.dirname(zip_path)
-        zip_filename: str = os.path.splitext(zip_path)[0].split(os.path.sep)[-1]
-        tmp_zip_path: str = os.path.join(zip_dirname, f"{zip_filename}_tmp.zip")
-        with zipfile.ZipFile(zip_path, 'r') as zin:
-            with zipfile.ZipFile(tmp_zip_path, 'w') as zout:
-                zout.comment = zin.comment
-                for item in zin.infolist():
-                    if item.filename != filename:
-                        zout.writestr(item, zin.read(item.filename))
-        os.remove(zip_path)
-        os.rename(tmp_zip_path, zip_path)
-        with zipfile.ZipFile(zip_path, 'a') as zf:
-            zf.writestr(filename, data)
+    def remote_objects(self,
+                        api_obj: ApiObject,
+                        object_names: list[str],
+                        columns: list[str]
+                        ) -> dict[str, dict[str, any]]:
+        name_field: str = api_obj.data_model.name_field()
+        if len(object_names) == 1:
+            objects: list[dict[str, any]] = api_obj.list_all(columns=['id', name_field, *columns],
+                                                             **{name_field: object_names[0]})
+        else:
+            # one projected listing of the whole class is cheaper than a request per name
+            objects: list[dict[str, any]] = api_obj.list_all(columns=['id', name_field, *columns])
+        names: set[str] = set(object_names)
+        latest: dict[str, dict[str, any]] = {}
+        for obj in objects:
+            obj_name: str = obj.get(name_field, object_names[0])
+            if obj_name in names and (obj_name not in latest or obj['id'] > latest[obj_name]['id']):
+                latest[obj_name] = obj
+        return latest
+
+    def load_uuid_map(self,
+                      object_names: list[str],
+                      object_class: str,
+                      remote: dict[str, dict[str, any]] = None
+                      ) -> dict[str, bidict]:
+        registry: UuidRegistry = self.deployer.uuid_registry
+        api_obj: ApiObject = getattr(self.deployer.api_client, object_class)
+        # one small list request tells which target objects exist and, if the list exposes it, their uuids
+        if remote is None:
+            remote = self.remote_objects(api_obj, object_names, ['uuid'])
+        stale_ids: dict[str, int] = {}
+        for obj_name, obj in remote.items():
+            deploy_name: str = self.deployer.get_deploy_object_name(obj_name)
+            registered_uuid: str = registry.uuid_for(object_class, deploy_name)
+            remote_uuid: str = obj.get('uuid')
+            if registered_uuid is None or (remote_uuid and remote_uuid != registered_uuid):
+                # names that differ only in characters dropped from deploy names share one entry, the latest wins
+                stale_ids[deploy_name] = max(obj['id'], stale_ids.get(deploy_name, obj['id']))
+        if stale_ids:
+            logging.info(f"Uuid registry of {self.deployer.env} is stale for {len(stale_ids)} {object_class}, "
+                         f"rebuilding it from the export")
+            self.deployer.extractor.build_uuid_map(object_class, sorted(stale_ids.values()))
+        self._check_dependency_uuids(object_names, object_class, registry.load_uuid_map())
+        return registry.load_uuid_map()
+
+    def _check_dependency_uuids(self, object_names: list[str], object_class: str, uuid_map: dict[str, bidict]) -> None:
+        # a dependency deleted or recreated on the server must not be imported under its old uuid
+        registry: UuidRegistry = self.deployer.uuid_registry
+        catalogue: DeployCatalogue = self.deployer.catalogue
+        targets: set[tuple[str, str]] = {(object_class, self.deployer.get_deploy_object_name(object_name))
+                                         for object_name in object_names}
+        dependencies: set[tuple[str, str]] = catalogue.closure(targets) - targets
+        for dep_class in OBJECT_CLASSES:
+            registered: dict[str, str] = {deploy_name: uuid_map[dep_class].inverse.get(deploy_name)
+                                          for node_class, deploy_name in dependencies if node_class == dep_class}
+            if not registered:
+                continue
+            api_obj: ApiObject = getattr(self.deployer.api_client, dep_class)
+            found: set[str] = {obj['uuid'] for obj in api_obj.list_by_uuid(
+                [uuid for uuid in registered.values() if uuid]
+            )}
+            unresolved: dict[str, str] = {catalogue.get(dep_class, deploy_name).name: deploy_name
+                                          for deploy_name, uuid in registered.items() if uuid not in found}
+            if not unresolved:
+                continue
+            logging.info(f"Uuid registry of {self.deployer.env} is stale for {len(unresolved)} {dep_class}, "
+                         f"looking them up by name")
+            remote: dict[str, dict[str, any]] = self.remote_objects(api_obj, list(unresolved), ['uuid'])
+            rebuilt: dict[str, str] = {}
+            for obj_name, deploy_name in unresolved.items():
+                remote_uuid: str = remote.get(obj_name, {}).get('uuid')
+                if remote_uuid:
+                    rebuilt[remote_uuid] = deploy_name
+                elif registered[deploy_name]:
+                    # the object is gone, the import creates it with the local uuid
+                    registry.forget(dep_class, deploy_name)
+            registry.update({dep_class: rebuilt})
 
     def import_object(self,
                       object_name: str,
                       object_class: str = 'datasets'
                       ) -> None:
-        # build uuids map
-        self.deployer.extractor.extract_object(object_name, object_class, True)
-
-        zip_filename: str = f"import_{self.deployer.env}_{object_class}_{object_name}.zip"
-        zip_dirname: str = os.path.splitext(zip_filename)[0]
-        obj_deploy_name: str = self.deployer.get_deploy_object_name(object_name)
+        self.import_objects([object_name], object_class)
+
+    def import_objects(self,
+                       object_names: list[str],
+                       object_class: str = 'dashboards',
+                       uuid_map: dict[str, bidict] = None
+                       ) -> None:
+        if not object_names:
+            return
+        if uuid_map is None:
+            uuid_map = self.load_uuid_map(object_names, object_class)
+        batch_size: int = self.deployer.config.get('import_batch_size') or len(object_names)
+        for i in range(0, len(object_names), batch_size):
+            self.import_bundle(object_names[i:i + batch_size], object_class, uuid_map)
+
+    def import_bundle(self,
+                      object_names: list[str],
+                      object_class: str,
+                      uuid_map: dict[str, bidict],
+                      build_order: list[tuple[str, str]] = None,
+                      rate_limiter: TokenBucket = None,
+                      skip_classes: tuple[str, ...] = ()
+                      ) -> float:
+        self.deployer.catalogue.refresh()
+
+        zip_dirname: str = f"import_{self.deployer.env}_{object_class}_{object_names[0]}" if len(object_names) == 1 \
+            else f"import_{self.deployer.env}_{object_class}"
         metadata: dict[str, any] = {
             'version': '1.0.0',
             'timestamp': datetime.now().isoformat()
         }
-        with zipfile.ZipFile(zip_filename, 'w') as obj_zip:
-            import_builder: SupersetObjectImportBuilder = SupersetObjectImportBuilder(
-                self,
-                obj_zip,
-                zip_dirname
-            )
-            getattr(import_builder, f"build_{object_class[:-1]}_for_import")(obj_deploy_name)
-
+        build_nodes: list[tuple[str, str]] = build_order or [
+            (object_class, self.deployer.get_deploy_object_name(object_name)) for object_name in object_names]
+        closure: set[tuple[str, str]] = self.deployer.catalogue.closure(build_nodes)
+        # the built members depend only on the closure files and on the uuid rewrites for the env
+        cache_key: str = BundleCache.key([
+            zip_dirname, *(self.deployer.catalogue.signature(*node, uuid_map) for node in closure)
+        ])
+        members: bytes = self.bundle_cache.get(cache_key)
+        if members is None:
+            members_buffer: io.BytesIO = io.BytesIO()
+            with zipfile.ZipFile(members_buffer, 'w') as obj_zip:
+                import_builder: SupersetObjectImportBuilder = SupersetObjectImportBuilder(
+                    self,
+                    obj_zip,
+                    zip_dirname,
+                    uuid_map
+                )
+                # objects shared by several targets are written into the bundle only once
+                for build_obj_class, deploy_name in build_nodes:
+                    getattr(import_builder, f"build_{build_obj_class[:-1]}_for_import")(deploy_name)
+            members = members_buffer.getvalue()
+            self.bundle_cache.put(cache_key, members)
+        logging.info(f"Import {len(object_names)} {object_class} to {self.deployer.env}. "
+                     f"Bundle contains {len(closure)} objects")
+        built_uuids: dict[str, dict[str, str]] = {build_obj_class: {} for build_obj_class in uuid_map}
+        for build_obj_class, deploy_name in closure:
+            uuid: str = self.deployer.catalogue.effective_uuid(build_obj_class, deploy_name, uuid_map)
+            if uuid:
+                built_uuids[build_obj_class][uuid] = deploy_name
+
+        waited: float = 0.0
         for build_obj_class, ss_obj_type in self._get_object_map(object_class).items():
+            if build_obj_class in skip_classes:
+                continue
             metadata['type'] = ss_obj_type
-            self._update_zip_file(zip_filename, f"{zip_dirname}/metadata.yaml", yaml.dump(metadata))
+            # levels differ only by metadata.yaml, so it is appended to a copy of the built members
+            bundle: io.BytesIO = io.BytesIO(members)
+            with zipfile.ZipFile(bundle, 'a') as bundle_zip:
+                bundle_zip.writestr(f"{zip_dirname}/metadata.yaml", yaml_codec.dump(metadata, fast=True))
             api_obj: ApiObject = getattr(self.deployer.api_client, build_obj_class)
             passwords: dict[str, str] = {
                 "examples": "superset"
             }
-            api_obj.import_from_file(zip_filename, True, passwords)
+            if rate_limiter is not None:
+                waited += rate_limiter.acquire()
+            api_obj.import_from_buffer(bundle, True, passwords)
+        self.deployer.uuid_registry.update(built_uuids)
+        # the ids of the imported objects are cached, so later lookups by uuid skip a request
+        for build_obj_class, uuids in built_uuids.items():
+            if uuids:
+                getattr(self.deployer.api_client, build_obj_class).list_by_uuid(list(uuids))
 
         if object_class == 'dashboards':
-            dashboards: list = self.deployer.api_client.dashboards.find_by_name(name=object_name)
-            if dashboards:
-                dash: Dashboard = max(dashboards, key=lambda el: el.id)
-                dash.published = True
-                dash.save()
+            # the uuids written into the bundle identify the imported dashboards even when titles repeat
+            dash_uuids: list[str] = [
+                self.deployer.catalogue.effective_uuid(
+                    'dashboards', self.deployer.get_deploy_object_name(object_name), uuid_map
+                ) for object_name in object_names
+            ]
+            dashboards: list[Dashboard] = self.deployer.api_client.dashboards.get_many_by_uuid(
+                [dash_uuid for dash_uuid in dash_uuids if dash_uuid]
+            )
+            for dash in dashboards:
+                if not dash.published:
+                    dash.published = True
+                    dash.save()
+        return waited
+
+    def import_shared_objects(self,
+                              object_class: str,
+                              shared_nodes: list[tuple[str, str]],
+                              uuid_map: dict[str, bidict],
+                              rate_limiter: TokenBucket = None
+                              ) -> float:
+        waited: float = 0.0
+        deployed_classes: dict[str, str] = self._get_object_map(object_class)
+        for shared_class in dict.fromkeys(shared_class for shared_class, _ in shared_nodes):
+            nodes: list[tuple[str, str]] = [node for node in shared_nodes if node[0] == shared_class]
+            if shared_class not in deployed_classes:
+                # objects below the deployed levels are only created when missing, as the bundles would do
+                api_obj: ApiObject = getattr(self.deployer.api_client, shared_class)
+                uuids: dict[tuple[str, str], str] = {
+                    node: self.deployer.catalogue.effective_uuid(*node, uuid_map) for node in nodes
+                }
+                api_obj.get_many_by_uuid([uuid for uuid in uuids.values() if uuid])
+                nodes = [node for node in nodes if uuids[node] not in api_obj.uuid_ids]
+            if nodes:
+                waited += self.import_bundle([self.deployer.catalogue.get(*node).name for node in nodes],
+                                             shared_class, uuid_map, nodes, rate_limiter)
+        return waited
 
 
 class SupersetObjectImportBuilder:
     def __init__(self,
                  ss_importer: SupersetObjectImporter,
                  object_zip: zipfile.ZipFile,
-                 zip_root_dir: str
+                 zip_root_dir: str,
+                 uuid_map: dict[str, bidict]
                  ):
         self.ss_importer = ss_importer
         self.object_zip = object_zip
         self.zip_root_dir = zip_root_dir
-        self.objects_to_build: list[str] = list()
+        self.uuid_map = uuid_map
+        self.objects_to_build: set[tuple[str, str]] = set()
         self.deployer = self.ss_importer.deployer
-        self.extractor = self.deployer.extractor
+        self.catalogue = self.deployer.catalogue
 
     def build_database_for_import(self, db_deploy_name: str) -> None:
         db_dir: str = self.deployer.object_path('databases')
         db_path: str = os.path.join(db_dir, f"{db_deploy_name}.yaml")
 
-        if db_path in self.objects_to_build:
+        if ('databases', db_deploy_name) in self.objects_to_build:
             return
 
-        if not os.path.exists(db_path):
+        db_yaml: dict[str, any] = self.catalogue.document('databases', db_deploy_name)
+        if db_yaml is None:
             raise FileNotFoundError(f"Database {db_deploy_name} not found in directory {db_dir}")
 
-        with open(db_path, 'r', encoding='UTF-8') as db_file:
-            db_yaml: dict[str, any] = yaml.safe_load(db_file)
-            if self.extractor.uuid_map['databases'].inverse.get(db_deploy_name):
-                db_yaml['uuid'] = self.extractor.uuid_map['databases'].inverse[db_deploy_name]
-            zip_db_path: str = os.path.join(self.zip_root_dir, 'databases', f"{db_deploy_name}.yaml")
-            self.object_zip.writestr(zip_db_path, yaml.dump(db_yaml))
-        self.objects_to_build.append(db_path)
+        if self.uuid_map['databases'].inverse.get(db_deploy_name):
+            db_yaml['uuid'] = self.uuid_map['databases'].inverse[db_deploy_name]
+        zip_db_path: str = os.path.join(self.zip_root_dir, 'databases', f"{db_deploy_name}.yaml")
+        self.object_zip.writestr(zip_db_path, yaml_codec.dump(db_yaml, fast=True))
+        self.objects_to_build.add(('databases', db_deploy_name))
 
     def build_dataset_for_import(self, ds_deploy_name: str) -> None:
         ds_dir: str = self.deployer.object_path('datasets')
         ds_path: str = os.path.join(ds_dir, f"{ds_deploy_name}.yaml")
 
-        if ds_path in self.objects_to_build:
+        if ('datasets', ds_deploy_name) in self.objects_to_build:
             return
 
-        if not os.path.exists(ds_path):
+        ds_yaml: dict[str, any] = self.catalogue.document('datasets', ds_deploy_name)
+        if ds_yaml is None:
             raise FileNotFoundError(f"Dataset {ds_deploy_name} not found in directory {ds_dir}")
 
-        with open(ds_path, 'r', encoding='UTF-8') as ds_file:
-            ds_yaml: dict[str, any] = yaml.safe_load(ds_file)
-            if '_deploy_database_name' not in ds_yaml:
-                raise Exception(f"Property _deploy_database_name not found in {ds_path} file")
-            if self.extractor.uuid_map['datasets'].inverse.get(ds_deploy_name):
-                ds_yaml['uuid'] = self.extractor.uuid_map['datasets'].inverse[ds_deploy_name]
-            sql_path: str = os.path.join(ds_dir, f"{ds_deploy_name}.sql")
-            # read sql
-            if os.path.exists(sql_path):
-                with open(sql_path, 'r', encoding='UTF-8') as sql_file:
-                    ds_yaml['sql'] = sql_file.read()
-            db_name: str = ds_yaml['_deploy_database_name']
-            if self.extractor.uuid_map['databases'].inverse.get(db_name):
-                ds_yaml['database_uuid'] = self.extractor.uuid_map['databases'].inverse[db_name]
-            self.build_database_for_import(db_name)
-            del ds_yaml['_deploy_database_name']
-
-            zip_ds_path: str = os.path.join(self.zip_root_dir, 'datasets', db_name, f"{ds_deploy_name}.yaml")
-            self.object_zip.writestr(zip_ds_path, yaml.dump(ds_yaml))
-        self.objects_to_build.append(ds_path)
+        if '_deploy_database_name' not in ds_yaml:
+            raise Exception(f"Property _deploy_database_name not found in {ds_path} file")
+        if self.uuid_map['datasets'].inverse.get(ds_deploy_name):
+            ds_yaml['uuid'] = self.uuid_map['datasets'].inverse[ds_deploy_name]
+        sql_path: str = self.catalogue.get('datasets', ds_deploy_name).sql_path
+        # read sql
+        if sql_path:
+            with open(sql_path, 'r', encoding='UTF-8') as sql_file:
+                ds_yaml['sql'] = sql_file.read()
+        db_name: str = ds_yaml['_deploy_database_name']
+        if self.uuid_map['databases'].inverse.get(db_name):
+            ds_yaml['database_uuid'] = self.uuid_map['databases'].inverse[db_name]
+        self.build_database_for_import(db_name)
+        del ds_yaml['_deploy_database_name']
+
+        zip_ds_path: str = os.path.join(self.zip_root_dir, 'datasets', db_name, f"{ds_deploy_name}.yaml")
+        self.object_zip.writestr(zip_ds_path, yaml_codec.dump(ds_yaml, fast=True))
+        self.objects_to_build.add(('datasets', ds_deploy_name))
 
     def build_chart_for_import(self, chart_deploy_name: str) -> None:
         chart_dir: str = self.deployer.object_path('charts')
         chart_path: str = os.path.join(chart_dir, f"{chart_deploy_name}.yaml")
 
-        if not os.path.exists(chart_path):
+        if ('charts', chart_deploy_name) in self.objects_to_build:
+            return
+
+        chart_yaml: dict[str, any] = self.catalogue.document('charts', chart_deploy_name)
+        if chart_yaml is None:
             raise FileNotFoundError(f"Chart {chart_deploy_name} not found in directory {chart_dir}")
 
-        with open(chart_path, 'r', encoding='UTF-8') as chart_file:
-            chart_yaml: dict[str, any] = yaml.safe_load(chart_file)
-            if '_deploy_dataset_name' not in chart_yaml:
-                raise Exception(f"Property _deploy_dataset_name not found in {chart_path} file")
-            if self.extractor.uuid_map['charts'].inverse.get(chart_deploy_name):
-                chart_yaml['uuid'] = self.extractor.uuid_map['charts'].inverse[chart_deploy_name]
-            ds_name: str = chart_yaml['_deploy_dataset_name']
-            if self.extractor.uuid_map['datasets'].inverse.get(ds_name):
-                chart_yaml['dataset_uuid'] = self.extractor.uuid_map['datasets'].inverse[ds_name]
-            self.build_dataset_for_import(ds_name)
-            del chart_yaml['_deploy_dataset_name']
-
-            zip_chart_path: str = os.path.join(self.zip_root_dir, 'charts', f"{chart_deploy_name}.yaml")
-            self.object_zip.writestr(zip_chart_path, yaml.dump(chart_yaml))
+        if '_deploy_dataset_name' not in chart_yaml:
+            raise Exception(f"Property _deploy_dataset_name not found in {chart_path} file")
+        if self.uuid_map['charts'].inverse.get(chart_deploy_name):
+            chart_yaml['uuid'] = self.uuid_map['charts'].inverse[chart_deploy_name]
+        ds_name: str = chart_yaml['_deploy_dataset_name']
+        if self.uuid_map['datasets'].inverse.get(ds_name):
+            chart_yaml['dataset_uuid'] = self.uuid_map['datasets'].inverse[ds_name]
+        self.build_dataset_for_import(ds_name)
+        del chart_yaml['_deploy_dataset_name']
+
+        zip_chart_path: str = os.path.join(self.zip_root_dir, 'charts', f"{chart_deploy_name}.yaml")
+        self.object_zip.writestr(zip_chart_path, yaml_codec.dump(chart_yaml, fast=True))
+        self.objects_to_build.add(('charts', chart_deploy_name))
 
     def build_dashboard_for_import(self, dash_deploy_name: str) -> None:
         dashboard_dir: str = self.deployer.object_path('dashboards')
         dashboard_path: str = os.path.join(dashboard_dir, f"{dash_deploy_name}.yaml")
 
-        if not os.path.exists(dashboard_path):
+        if ('dashboards', dash_deploy_name) in self.objects_to_build:
+            return
+
+        dash_yaml: dict[str, any] = self.catalogue.document('dashboards', dash_deploy_name)
+        if dash_yaml is None:
             raise FileNotFoundError(f"Dashboard {dashboard_path} not found in directory {dashboard_dir}")
 
-        with open(dashboard_path, 'r', encoding='UTF-8') as dash_file:
-            dash_yaml: dict[str, any] = yaml.safe_load(dash_file)
-            if self.extractor.uuid_map['dashboards'].inverse.get(dash_deploy_name):
-                dash_yaml['uuid'] = self.extractor.uuid_map['dashboards'].inverse[dash_deploy_name]
-            if 'metadata' in dash_yaml and 'native_filter_configuration' in dash_yaml['metadata']:
-                for dash_filter in dash_yaml['metadata']['native_filter_configuration']:
-                    if 'targets' in dash_filter:
-                        for target in dash_filter['targets']:
-                            if target.get('_deploy_dataset_name'):
-                                ds_name: str = target['_deploy_dataset_name']
-                                if self.extractor.uuid_map['datasets'].inverse.get(ds_name):
-                                    target['datasetUuid'] = self.extractor.uuid_map['datasets'].inverse[ds_name]
-                                self.build_dataset_for_import(ds_name)
-                                del target['_deploy_dataset_name']
-
-            for pos_key, pos_val in dash_yaml['position'].items():
-                if type(pos_val) is dict and pos_key.lower().startswith('chart') \
-                        and 'uuid' in pos_val.get('meta') \
-                        and '_deploy_chart_name' in pos_val.get('meta'):
-                    chart_name: str = pos_val['meta']['_deploy_chart_name']
-                    if self.extractor.uuid_map['charts'].inverse.get(chart_name):
-                        pos_val['meta']['uuid'] = self.extractor.uuid_map['charts'].inverse[chart_name]
-                    self.build_chart_for_import(chart_name)
-                    del pos_val['meta']['_deploy_chart_name']
-
-            zip_dash_path: str = os.path.join(self.zip_root_dir, 'dashboards', f"{dash_deploy_name}.yaml")
-            self.object_zip.writestr(zip_dash_path, yaml.dump(dash_yaml))
+        if self.uuid_map['dashboards'].inverse.get(dash_deploy_name):
+            dash_yaml['uuid'] = self.uuid_map['dashboards'].inverse[dash_deploy_name]
+        if 'metadata' in dash_yaml and 'native_filter_configuration' in dash_yaml['metadata']:
+            for dash_filter in dash_yaml['metadata']['native_filter_configuration']:
+                if 'targets' in dash_filter:
+                    for target in dash_filter['targets']:
+                        if target.get('_deploy_dataset_name'):
+                            ds_name: str = target['_deploy_dataset_name']
+                            if self.uuid_map['datasets'].inverse.get(ds_name):
+                                target['datasetUuid'] = self.uuid_map['datasets'].inverse[ds_name]
+                            self.build_dataset_for_import(ds_name)
+                            del target['_deploy_dataset_name']
+
+        for pos_key, pos_val in dash_yaml['position'].items():
+            if type(pos_val) is dict and pos_key.lower().startswith('chart') \
+                    and 'uuid' in pos_val.get('meta') \
+                    and '_deploy_chart_name' in pos_val.get('meta'):
+                chart_name: str = pos_val['meta']['_deploy_chart_name']
+                if self.uuid_map['charts'].inverse.get(chart_name):
+                    pos_val['meta']['uuid'] = self.uuid_map['charts'].inverse[chart_name]
+                self.build_chart_for_import(chart_name)
+                del pos_val['meta']['_deploy_chart_name']
+
+        zip_dash_path: str = os.path.join(self.zip_root_dir, 'dashboards', f"{dash_deploy_name}.yaml")
+        self.object_zip.writestr(zip_dash_path, yaml_codec.dump(dash_yaml, fast=True))
+        self.objects_to_build.add(('dashboards', dash_deploy_name))
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+
+class ExtractManifest:
+    def __init__(self, path: str):
+        self.path = path
+        self.objects: dict[str, dict[str, any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='UTF-8') as f:
+                self.objects = json.load(f).get('objects', {})
+
+    @staticmethod
+    def manifest_path(deploy_path: str) -> str:
+        return f"{os.path.normpath(deploy_path)}.manifest.json"
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _entry(self, object_class: str, deploy_name: str) -> dict[str, any]:
+        return self.objects.setdefault(f"{object_class}/{deploy_name}", {})
+
+    def get(self, object_class: str, deploy_name: str) -> Optional[dict[str, any]]:
+        return self.objects.get(f"{object_class}/{deploy_name}")
+
+    def _file_matches(self, entry: dict[str, any], file_path: str) -> bool:
+        # the stat recorded at write time is a fast path, a touched file is compared by its content
+        file_name: str = os.path.basename(file_path)
+        try:
+            stat: os.stat_result = os.stat(file_path)
+        except FileNotFoundError:
+            return False
+        stats: dict[str, list[int]] = entry.setdefault('stats', {})
+        if stats.get(file_name) == [stat.st_mtime_ns, stat.st_size]:
+            return True
+        with open(file_path, 'rb') as f:
+            if self.content_hash(f.read()) != entry.get('hashes', {}).get(file_name):
+                return False
+        stats[file_name] = [stat.st_mtime_ns, stat.st_size]
+        return True
+
+    def is_unchanged(self,
+                     object_class: str,
+                     deploy_name: str,
+                     changed_on: Optional[str],
+                     deploy_path: str,
+                     remote_changed_on: dict[str, dict[str, str]]
+                     ) -> bool:
+        # the object and every dependency it was extracted with must be unchanged on the server and on disk,
+        # the changed_on of dependencies is looked up by their uuid in remote_changed_on
+        stack: list[tuple[str, str, Optional[str]]] = [(object_class, deploy_name, changed_on)]
+        seen: set[tuple[str, str]] = set()
+        while stack:
+            node_class, node_name, node_changed_on = stack.pop()
+            if (node_class, node_name) in seen:
+                continue
+            seen.add((node_class, node_name))
+            entry: Optional[dict[str, any]] = self.get(node_class, node_name)
+            if not node_changed_on or entry is None or entry.get('changed_on') != node_changed_on \
+                    or 'dependencies' not in entry:
+                return False
+            if not all(self._file_matches(entry, os.path.join(deploy_path, node_class, file_name))
+                       for file_name in entry.get('hashes', {})):
+                return False
+            for dep_class, dep_name in entry['dependencies']:
+                dep_entry: dict[str, any] = self.get(dep_class, dep_name) or {}
+                stack.append((dep_class, dep_name, remote_changed_on.get(dep_class, {}).get(dep_entry.get('uuid'))))
+        return True
+
+    def set_changed_on(self, object_class: str, deploy_name: str, changed_on: Optional[str]) -> None:
+        self._entry(object_class, deploy_name)['changed_on'] = changed_on
+
+    def set_dependencies(self, object_class: str, deploy_name: str, dependencies: list[tuple[str, str]]) -> None:
+        self._entry(object_class, deploy_name)['dependencies'] = [list(dependency) for dependency in dependencies]
+
+    def write(self, object_class: str, deploy_name: str, file_path: str, data: bytes, uuid: str = None) -> bool:
+        entry: dict[str, any] = self._entry(object_class, deploy_name)
+        if uuid:
+            entry['uuid'] = uuid
+        hashes: dict[str, str] = entry.setdefault('hashes', {})
+        file_name: str = os.path.basename(file_path)
+        data_hash: str = self.content_hash(data)
+        if hashes.get(file_name) == data_hash and self._file_matches(entry, file_path):
+            return False
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        hashes[file_name] = data_hash
+        stat: os.stat_result = os.stat(file_path)
+        entry.setdefault('stats', {})[file_name] = [stat.st_mtime_ns, stat.st_size]
+        return True
+
+    def save(self) -> None:
+        tmp_path: str = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='UTF-8') as f:
+            json.dump({'objects': self.objects}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+import graphlib
+import hashlib
+import logging
+import math
+from dataclasses import dataclass, field
+from bidict import bidict
+from Deployer.scheduler import DeploymentScheduler, DeploymentTiming, TokenBucket
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Deployer.catalogue import DeployCatalogue
+    from SupersetApiClient.api_object import ApiObject
+    from Deployer.superset_deployer import SupersetDeployer
+
+Node = tuple[str, str]
+
+SHARED_OBJECT_CLASSES: tuple[str, ...] = ('databases',)
+
+CHANGE_NEW: str = 'new'
+CHANGE_UNTRACKED: str = 'not imported by the deployer'
+CHANGE_MODIFIED: str = 'modified'
+CHANGE_REMOTE: str = 'changed on the server'
+CHANGE_NONE: str = 'unchanged'
+
+
+@dataclass(slots=True)
+class DeploymentBundle:
+    object_names: list[str]
+    build_order: list[Node]
+
+
+@dataclass(slots=True)
+class DeploymentUnit:
+    # bundles of a unit share dependencies, so one worker imports them one after another
+    bundles: list[DeploymentBundle]
+
+    @property
+    def object_names(self) -> list[str]:
+        return [object_name for bundle in self.bundles for object_name in bundle.object_names]
+
+
+@dataclass(slots=True)
+class DeploymentPlan:
+    object_class: str
+    object_names: list[str]
+    graph: dict[Node, set[Node]]
+    order: list[Node]
+    units: list[DeploymentUnit] = field(default_factory=list)
+    # shared dependencies of the units, imported once before the units run concurrently
+    shared: list[Node] = field(default_factory=list)
+    uuid_map: dict[str, bidict] = None
+    changes: dict[str, str] = field(default_factory=dict)
+    tree_hashes: dict[str, str] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        deployed: int = sum(len(unit.object_names) for unit in self.units)
+        lines: list[str] = [f"{deployed} of {len(self.object_names)} {self.object_class} will be imported "
+                            f"in {sum(len(unit.bundles) for unit in self.units)} bundles "
+                            f"by {len(self.units)} concurrent units"]
+        if self.shared:
+            lines.append(f"{len(self.shared)} shared objects will be imported first: "
+                         f"{', '.join('/'.join(node) for node in self.shared)}")
+        for object_name, change in self.changes.items():
+            lines.append(f"  {change}: {object_name}")
+        return "\n".join(lines)
+
+
+class DeploymentPlanner:
+    def __init__(self, deployer: SupersetDeployer):
+        self.deployer = deployer
+
+    def _build_graph(self, targets: list[Node]) -> dict[Node, set[Node]]:
+        catalogue: DeployCatalogue = self.deployer.catalogue
+        graph: dict[Node, set[Node]] = {}
+        stack: list[Node] = list(targets)
+        while stack:
+            node: Node = stack.pop()
+            if node in graph:
+                continue
+            object_class, deploy_name = node
+            if catalogue.get(object_class, deploy_name) is None:
+                raise FileNotFoundError(f"{object_class[:-1].capitalize()} {deploy_name} not found in directory "
+                                        f"{self.deployer.object_path(object_class)}")
+            graph[node] = set(catalogue.dependencies(object_class, deploy_name))
+            stack.extend(graph[node])
+        return graph
+
+    @staticmethod
+    def _components(graph: dict[Node, set[Node]]) -> dict[Node, Node]:
+        # union-find over dependency edges: objects sharing a dependency land in the same component,
+        # except for databases, which nearly everything shares and which are imported before the units
+        parent: dict[Node, Node] = {node: node for node in graph}
+
+        def find(node: Node) -> Node:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for node, dependencies in graph.items():
+            for dependency in dependencies:
+                if dependency[0] not in SHARED_OBJECT_CLASSES:
+                    parent[find(dependency)] = find(node)
+        return {node: find(node) for node in graph}
+
+    @staticmethod
+    def _closure(graph: dict[Node, set[Node]], targets: list[Node]) -> set[Node]:
+        nodes: set[Node] = set()
+        stack: list[Node] = list(targets)
+        while stack:
+            node: Node = stack.pop()
+            if node not in nodes:
+                nodes.add(node)
+                stack.extend(graph[node])
+        return nodes
+
+    def _tree_hash(self, graph: dict[Node, set[Node]], target: Node, uuid_map: dict[str, bidict]) -> str:
+        # an object is unchanged only if nothing in its dependency closure changed, uuid rewrites included
+        digest = hashlib.sha256()
+        for object_class, deploy_name in sorted(self._closure(graph, [target])):
+            digest.update(f"{self.deployer.catalogue.signature(object_class, deploy_name, uuid_map)}\n".encode('UTF-8'))
+        return digest.hexdigest()
+
+    def _remote_changed_on(self, nodes: set[Node], uuid_map: dict[str, bidict]) -> dict[Node, str]:
+        # one projected listing per class, by the uuids the objects are imported with
+        uuids: dict[str, dict[str, Node]] = {}
+        for node in nodes:
+            uuid: str = self.deployer.catalogue.effective_uuid(*node, uuid_map)
+            if uuid:
+                uuids.setdefault(node[0], {})[uuid] = node
+        changed_on: dict[Node, str] = {}
+        for object_class, class_uuids in uuids.items():
+            api_obj: ApiObject = getattr(self.deployer.api_client, object_class)
+            for obj in api_obj.list_by_uuid(list(class_uuids), ['changed_on_utc']):
+                if obj['uuid'] in class_uuids:
+                    changed_on[class_uuids[obj['uuid']]] = obj.get('changed_on_utc')
+        return changed_on
+
+    def _remote_state(self, graph: dict[Node, set[Node]], target: Node, changed_on: dict[Node, str]) -> str:
+        # an edit on the server of any object of the closure, not only of the target, is a drift
+        digest = hashlib.sha256()
+        for node in sorted(self._closure(graph, [target])):
+            digest.update(f"{'/'.join(node)}={changed_on.get(node)}\n".encode('UTF-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _change(tree_hash: str,
+                remote_obj: dict[str, any],
+                state: tuple[str, str],
+                remote_state: str
+                ) -> str:
+        if remote_obj is None:
+            return CHANGE_NEW
+        if state is None:
+            return CHANGE_UNTRACKED
+        if state[0] != tree_hash:
+            return CHANGE_MODIFIED
+        if state[1] != remote_state:
+            return CHANGE_REMOTE
+        return CHANGE_NONE
+
+    def plan(self,
+             object_names: list[str],
+             object_class: str = 'dashboards',
+             workers: int = None,
+             force: bool = False
+             ) -> DeploymentPlan:
+        self.deployer.catalogue.refresh()
+        object_names = list(dict.fromkeys(object_names))
+        targets: dict[Node, str] = {(object_class, self.deployer.get_deploy_object_name(object_name)): object_name
+                                    for object_name in object_names}
+        graph: dict[Node, set[Node]] = self._build_graph(list(targets))
+        order: list[Node] = list(graphlib.TopologicalSorter(graph).static_order())
+        positions: dict[Node, int] = {node: i for i, node in enumerate(order)}
+        roots: dict[Node, Node] = self._components(graph)
+        plan: DeploymentPlan = DeploymentPlan(object_class, object_names, graph, order)
+
+        # diff stage: compare the local dependency closures with the state recorded by the last import
+        api_obj: ApiObject = getattr(self.deployer.api_client, object_class)
+        remote: dict[str, dict[str, any]] = self.deployer.importer.remote_objects(
+            api_obj, object_names, ['uuid', 'changed_on_utc']
+        )
+        plan.uuid_map = self.deployer.importer.load_uuid_map(object_names, object_class, remote)
+        states: dict[str, tuple[str, str]] = self.deployer.uuid_registry.import_states(object_class)
+        changed_on: dict[Node, str] = self._remote_changed_on(set(graph), plan.uuid_map)
+        for target, object_name in targets.items():
+            plan.tree_hashes[object_name] = self._tree_hash(graph, target, plan.uuid_map)
+            plan.changes[object_name] = self._change(plan.tree_hashes[object_name], remote.get(object_name),
+                                                     states.get(target[1]),
+                                                     self._remote_state(graph, target, changed_on))
+
+        component_targets: dict[Node, list[Node]] = {}
+        for target, object_name in targets.items():
+            if force or plan.changes[object_name] != CHANGE_NONE:
+                component_targets.setdefault(roots[target], []).append(target)
+        deploy_count: int = sum(len(component) for component in component_targets.values())
+
+        # pack whole components into units, small enough to keep every worker busy
+        workers = workers or self.deployer.config.get('deploy_workers') or 1
+        batch_size: int = self.deployer.config.get('import_batch_size') or max(deploy_count, 1)
+        unit_size: int = max(1, min(batch_size, math.ceil(deploy_count / workers)))
+        unit_targets: list[Node] = []
+        for component in sorted(component_targets.values(), key=lambda el: -len(el)):
+            if len(component) > batch_size:
+                # a component larger than a bundle is split into bundles imported one after another
+                plan.units.append(DeploymentUnit([
+                    self._bundle(graph, positions, targets, component[i:i + batch_size])
+                    for i in range(0, len(component), batch_size)
+                ]))
+                continue
+            if unit_targets and len(unit_targets) + len(component) > unit_size:
+                plan.units.append(DeploymentUnit([self._bundle(graph, positions, targets, unit_targets)]))
+                unit_targets = []
+            unit_targets.extend(component)
+        if unit_targets:
+            plan.units.append(DeploymentUnit([self._bundle(graph, positions, targets, unit_targets)]))
+        if object_class not in SHARED_OBJECT_CLASSES:
+            # concurrent units must not create or overwrite the same database at the same time
+            deploy_targets: list[Node] = [target for component in component_targets.values() for target in component]
+            plan.shared = sorted((node for node in self._closure(graph, deploy_targets)
+                                  if node[0] in SHARED_OBJECT_CLASSES), key=positions.__getitem__)
+        logging.info(f"Deployment plan for {len(object_names)} {object_class}: {len(graph)} objects, "
+                     f"{len(component_targets)} independent groups, "
+                     f"{sum(len(unit.bundles) for unit in plan.units)} bundles in {len(plan.units)} units")
+        return plan
+
+    def _bundle(self,
+                graph: dict[Node, set[Node]],
+                positions: dict[Node, int],
+                targets: dict[Node, str],
+                bundle_targets: list[Node]
+                ) -> DeploymentBundle:
+        # nodes follow the topological order, so dependencies are always built first
+        return DeploymentBundle([targets[target] for target in bundle_targets],
+                                sorted(self._closure(graph, bundle_targets), key=positions.__getitem__))
+
+    def deploy_bundle(self,
+                      plan: DeploymentPlan,
+                      bundle: DeploymentBundle,
+                      rate_limiter: TokenBucket = None
+                      ) -> float:
+        importer = self.deployer.importer
+        # the shared objects are already imported, the bundle only references them
+        waited: float = importer.import_bundle(bundle.object_names, plan.object_class, plan.uuid_map,
+                                               bundle.build_order, rate_limiter,
+                                               tuple(dict.fromkeys(object_class for object_class, _ in plan.shared)))
+        # the state is recorded after publishing, so the stored changed_on values are the final ones;
+        # only the objects of the bundle are fetched, by the uuids written into it
+        changed_on: dict[Node, str] = self._remote_changed_on(set(bundle.build_order), plan.uuid_map)
+        states: dict[str, tuple[str, str]] = {}
+        for object_name in bundle.object_names:
+            target: Node = (plan.object_class, self.deployer.get_deploy_object_name(object_name))
+            states[target[1]] = (plan.tree_hashes[object_name], self._remote_state(plan.graph, target, changed_on))
+        self.deployer.uuid_registry.record_imports(plan.object_class, states)
+        return waited
+
+    def deploy_shared(self, plan: DeploymentPlan, rate_limiter: TokenBucket = None) -> float:
+        return self.deployer.importer.import_shared_objects(plan.object_class, plan.shared, plan.uuid_map,
+                                                            rate_limiter)
+
+    def deploy_unit(self, plan: DeploymentPlan, unit: DeploymentUnit, rate_limiter: TokenBucket = None) -> float:
+        return sum(self.deploy_bundle(plan, bundle, rate_limiter) for bundle in unit.bundles)
+
+    def deploy(self, plan: DeploymentPlan, workers: int = None) -> list[DeploymentTiming]:
+        return DeploymentScheduler(self.deployer, workers).run(plan)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Deployer.planner import DeploymentPlan, DeploymentUnit
+    from Deployer.superset_deployer import SupersetDeployer
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        waited: float = 0.0
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay: float = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass(slots=True)
+class DeploymentTiming:
+    object_class: str
+    object_names: list[str]
+    seconds: float
+    waited_seconds: float = 0.0
+    error: Optional[Exception] = None
+
+
+class DeploymentScheduler:
+    def __init__(self,
+                 deployer: SupersetDeployer,
+                 workers: int = None,
+                 rate_per_minute: float = None,
+                 burst: int = None
+                 ):
+        self.deployer = deployer
+        self.workers: int = workers or self.deployer.config.get('deploy_workers') or 1
+        rate_per_minute = rate_per_minute or self.deployer.config.get('deploy_rate_per_minute')
+        burst = burst or self.deployer.config.get('deploy_burst') or 1
+        # one token per import request, shared by all workers
+        self.rate_limiter: Optional[TokenBucket] = TokenBucket(rate_per_minute / 60, burst) \
+            if rate_per_minute else None
+
+    def _run(self, object_class: str, object_names: list[str], deploy: Callable[[], float]) -> DeploymentTiming:
+        start: float = time.perf_counter()
+        try:
+            waited: float = deploy()
+        except Exception as e:
+            timing = DeploymentTiming(object_class, object_names, time.perf_counter() - start, error=e)
+            logging.warning(f"Deploy {object_class} {', '.join(object_names)} failed "
+                            f"after {timing.seconds:.1f}s: {e}")
+            return timing
+        timing = DeploymentTiming(object_class, object_names, time.perf_counter() - start, waited)
+        for object_name in object_names:
+            logging.info(f"Deploy {object_class[:-1]} {object_name}: {timing.seconds:.1f}s "
+                         f"(unit of {len(object_names)}, rate limit wait {timing.waited_seconds:.1f}s)")
+        return timing
+
+    def _run_unit(self, plan: DeploymentPlan, unit: DeploymentUnit) -> DeploymentTiming:
+        return self._run(plan.object_class, unit.object_names,
+                         lambda: self.deployer.planner.deploy_unit(plan, unit, self.rate_limiter))
+
+    def _run_shared(self, plan: DeploymentPlan) -> DeploymentTiming:
+        return self._run(plan.shared[0][0], [deploy_name for _, deploy_name in plan.shared],
+                         lambda: self.deployer.planner.deploy_shared(plan, self.rate_limiter))
+
+    def _run_plan(self, plan: DeploymentPlan) -> list[DeploymentTiming]:
+        if not plan.units:
+            logging.info(f"Deploy {plan.object_class}. Nothing changed since the last import")
+            return []
+        timings: list[DeploymentTiming] = []
+        if plan.shared:
+            # the units only reference the shared objects, so they are not started if those failed
+            timings.append(self._run_shared(plan))
+            if timings[-1].error:
+                return timings
+        if self.workers <= 1 or len(plan.units) == 1:
+            return timings + [self._run_unit(plan, unit) for unit in plan.units]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return timings + list(executor.map(lambda unit: self._run_unit(plan, unit), plan.units))
+
+    def run(self, *plans: DeploymentPlan) -> list[DeploymentTiming]:
+        # plans run one after another in the given order, units of a plan run concurrently
+        timings: list[DeploymentTiming] = []
+        start: float = time.perf_counter()
+        for plan in plans:
+            timings.extend(self._run_plan(plan))
+        failed: list[DeploymentTiming] = [timing for timing in timings if timing.error]
+        logging.info(f"Deployed {sum(len(timing.object_names) for timing in timings if not timing.error)} objects "
+                     f"in {len(timings)} units in {time.perf_counter() - start:.1f}s, {len(failed)} units failed")
+        if failed:
+            raise Exception(f"Deployment of {', '.join(name for timing in failed for name in timing.object_names)} "
+                            f"failed") from failed[0].error
+        return timings
+
+    @staticmethod
+    def object_timings(timings: list[DeploymentTiming]) -> dict[str, float]:
+        return {f"{timing.object_class}/{object_name}": timing.seconds
+                for timing in timings for object_name in timing.object_names}
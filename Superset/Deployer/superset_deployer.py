@@ -1,16 +1,20 @@
+import inspect
 import logging
 import re
 
-import yaml
 import os
+from functools import cached_property
 from datetime import datetime, timedelta
-from dateutil import parser as dt_parser
 from transliterate import translit
 from Superset.SupersetApiClient.superset_client import SupersetClient
+from SupersetApiClient import yaml_codec
 from SupersetApiClient.api_object import ApiObject
 from SupersetApiClient.dashboards import Dashboard
 from Deployer.extractors import SupersetObjectExtractor
 from Deployer.importers import SupersetObjectImporter
+from Deployer.planner import DeploymentPlanner
+from Deployer.catalogue import DeployCatalogue
+from Deployer.uuid_registry import OBJECT_CLASSES, UuidRegistry
 
 
 class SupersetDeployer:
@@ -19,10 +23,10 @@ class SupersetDeployer:
     def __init__(self, env: str, **config_kwargs):
         self.env = env
         with open(f'Deployer/{self.env}.yaml', 'r') as f:
-            self.env_params: dict[str, str] = yaml.safe_load(f)
+            self.env_params: dict[str, str] = yaml_codec.load(f)
             self.api_client = SupersetClient(**self.env_params)
         with open('Deployer/config.yaml', 'r') as f:
-            self.config: dict[str, any] = yaml.safe_load(f)
+            self.config: dict[str, any] = yaml_codec.load(f)
         for k in self.config:
             if config_kwargs.get(k):
                 self.config[k] = config_kwargs[k]
@@ -33,10 +37,26 @@ class SupersetDeployer:
         if not os.path.exists(self.config['deploy_path']):
             os.mkdir(self.config['deploy_path'])
 
+        self.uuid_registry = UuidRegistry(UuidRegistry.registry_path(self.env))
+        self.catalogue = DeployCatalogue(
+            self.config['deploy_path'],
+            {object_class: getattr(self.api_client, object_class).data_model.name_field()
+             for object_class in OBJECT_CLASSES},
+            DeployCatalogue.catalogue_path(self.config['deploy_path']) if self.config.get('persist_catalogue') else None
+        )
         self.extractor = SupersetObjectExtractor(self)
         self.importer = SupersetObjectImporter(self)
+        self.planner = DeploymentPlanner(self)
         logging.getLogger().setLevel(logging.INFO)
 
+    @cached_property
+    def async_api_client(self):
+        # httpx is only required when the async client is used
+        from SupersetApiClient.async_superset_client import AsyncSupersetClient
+        # env options of the sync client only, like mirror_path, are not passed on
+        async_params: set[str] = set(inspect.signature(AsyncSupersetClient).parameters)
+        return AsyncSupersetClient(**{k: v for k, v in self.env_params.items() if k in async_params})
+
     @staticmethod
     def get_deploy_object_name(src_object_name: str):
         obj_name: str = translit(src_object_name, 'ru', reversed=True).replace(' ', '_')
@@ -46,46 +66,61 @@ class SupersetDeployer:
         return os.path.join(self.config['deploy_path'], object_class)
 
     def get_deployed_object_names(self, object_class: str = 'datasets') -> list[str]:
-        objects_dir: str = self.object_path(object_class)
-        obj_names: list[str] = []
-        for f in os.listdir(objects_dir):
-            if f.endswith('.yaml'):
-                with open(os.path.join(objects_dir, f), 'r', encoding='UTF-8') as f:
-                    obj_yaml: dict[str, any] = yaml.safe_load(f)
-                    api_object: ApiObject = getattr(self.api_client, object_class)
-                    obj_name: str = obj_yaml[api_object.data_model.name_field()]
-                    obj_names.append(obj_name)
-        return obj_names
-
-    def delete_empty_dashboards(self) -> None:
-        untitled_dashboards: list[Dashboard] = self.api_client.dashboards.get_untitled_dashboards() or []
-        del_ids: list[int] = []
-        for dash in untitled_dashboards:
-            if dt_parser.parse(dash.changed_on_utc).replace(tzinfo=None) \
-                    < datetime.utcnow() - timedelta(days=self.config['empty_dash_retention_in_days']) \
-                    and not dash.update().charts:
-                del_ids.append(dash.id)
-        self.api_client.dashboards.delete(ids=del_ids)
-
-    def delete_duplicate_dashboards(self):
-        dash_stat: dict[str, int] = dict()
-        dash_l: list[Dashboard] = self.api_client.dashboards.find_all()
-        titles: list[str] = [dash.dashboard_title for dash in dash_l]
-        uniq_titles: set[str] = set(titles)
-
-        for title in uniq_titles:
-            dash_stat[title] = titles.count(title)
-
-        for dash_title, cnt in dash_stat.items():
-            if cnt > 1:
-                sel_dash: Dashboard = max([d for d in dash_l if d.dashboard_title == dash_title],
-                                          key=lambda d: d.changed_on_utc)
-                dash_for_del: list[Dashboard] = [d for d in dash_l if d.dashboard_title == dash_title
-                                                 and d.id != sel_dash.id]
-                for dash in dash_for_del:
-                    if dash.delete():
-                        logging.info(f"Dashboard {dash.dashboard_title} ({dash.id}) was deleted")
-
+        self.catalogue.refresh()
+        return self.catalogue.names(object_class)
+
+    def delete_empty_dashboards(self, chunk_size: int = 100) -> list[int]:
+        api_dashboards: ApiObject = self.api_client.dashboards
+        retention_start: datetime = datetime.utcnow() - timedelta(days=self.config['empty_dash_retention_in_days'])
+        # the retention window is filtered by the server, only ids of old untitled dashboards are fetched
+        untitled_dashboards: list[Dashboard] = api_dashboards.get_untitled_dashboards(
+            changed_before=retention_start.isoformat(), columns=['id']
+        )
+        dash_ids: list[int] = [dash.id for dash in untitled_dashboards]
+        # one chart listing per chunk finds the dashboards that have charts
+        filled_ids: set[int] = set()
+        try:
+            for i in range(0, len(dash_ids), chunk_size):
+                chunk: list[int] = dash_ids[i:i + chunk_size]
+                for chart in self.api_client.charts.list_all(
+                        filters=[dict(col='dashboards', opr='rel_m_m', value=chunk)], columns=['id', 'dashboards.id']):
+                    filled_ids.update(dash['id'] for dash in chart.get('dashboards') or [])
+        except Exception as e:
+            logging.warning(f"Charts could not be listed by dashboards ({e}), checking every dashboard")
+        # a dashboard missed by the listing is deleted only if its own chart list is empty
+        leftovers: list[int] = [dash_id for dash_id in dash_ids if dash_id not in filled_ids]
+        dash_charts: list[list[dict[str, any]]] = self.api_client.map_concurrent(api_dashboards.get_charts, leftovers)
+        del_ids: list[int] = [dash_id for dash_id, charts in zip(leftovers, dash_charts) if not charts]
+        for i in range(0, len(del_ids), chunk_size):
+            chunk: list[int] = del_ids[i:i + chunk_size]
+            api_dashboards.delete(ids=chunk).raise_for_status()
+            logging.info(f"Empty dashboards {chunk} were deleted")
+        return del_ids
+
+    def delete_duplicate_dashboards(self, dry_run: bool = False, chunk_size: int = 100) -> dict[str, list[int]]:
+        api_dashboards: ApiObject = self.api_client.dashboards
+        dash_groups: dict[str, list[dict[str, any]]] = {}
+        for dash in api_dashboards.list_all(columns=['id', 'dashboard_title', 'changed_on_utc']):
+            dash_groups.setdefault(dash['dashboard_title'], []).append(dash)
+
+        # the most recently changed dashboard of every title survives
+        report: dict[str, list[int]] = {}
+        for dash_title, dashboards in dash_groups.items():
+            if len(dashboards) > 1:
+                sel_dash: dict[str, any] = max(dashboards, key=lambda d: (d.get('changed_on_utc') or '', d['id']))
+                report[dash_title] = [d['id'] for d in dashboards if d['id'] != sel_dash['id']]
+        del_ids: list[int] = [dash_id for dash_ids in report.values() for dash_id in dash_ids]
+        if dry_run:
+            for dash_title, dash_ids in report.items():
+                logging.info(f"Dashboard {dash_title} has duplicates {dash_ids} to delete")
+            logging.info(f"{len(del_ids)} duplicate dashboards of {len(report)} titles would be deleted")
+            return report
+
+        for i in range(0, len(del_ids), chunk_size):
+            chunk: list[int] = del_ids[i:i + chunk_size]
+            api_dashboards.delete(ids=chunk).raise_for_status()
+            logging.info(f"Dashboards {chunk} were deleted")
+        return report
 
 if __name__ == '__main__':
     deployer = SupersetDeployer(env='dev')
@@ -93,9 +128,7 @@ if __name__ == '__main__':
 
     # deployer.extractor.extract_object('Top 10 Games: Proportion of Sales in Markets', 'charts')
 
-    for dash in deployer.api_client.dashboards.find_all():
-        print(f"Extract dashboard: {dash.dashboard_title}")
-        deployer.extractor.extract_object(object_name=dash.dashboard_title, object_class='dashboards')
+    deployer.extractor.extract_all('dashboards')
 
     deployer_prod = SupersetDeployer(env='prod')
 
@@ -105,9 +138,10 @@ if __name__ == '__main__':
 
     object_class: str = 'dashboards'
 
-    # for dash_title in deployer_prod.get_deployed_object_names(object_class):
-    #     deployer_prod.importer.import_object(dash_title, object_class)
-    #     print(dash_title)
+    # deploy_plan = deployer_prod.planner.plan(deployer_prod.get_deployed_object_names(object_class), object_class)
+    # print(deploy_plan.describe())
+    # for timing in deployer_prod.planner.deploy(deploy_plan):
+    #     print(timing)
 
     # for f in os.listdir(objects_dir):
     #     if f.endswith('.yaml'):
@@ -0,0 +1,88 @@
+import contextlib
+import os
+import sqlite3
+from typing import Iterator, Optional
+from bidict import bidict
+
+OBJECT_CLASSES: tuple[str, ...] = ('databases', 'datasets', 'charts', 'dashboards')
+
+
+class UuidRegistry:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uuid_registry ("
+                " object_class TEXT NOT NULL,"
+                " uuid TEXT NOT NULL,"
+                " deploy_name TEXT NOT NULL,"
+                " PRIMARY KEY (object_class, uuid),"
+                " UNIQUE (object_class, deploy_name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS import_state ("
+                " object_class TEXT NOT NULL,"
+                " deploy_name TEXT NOT NULL,"
+                " content_hash TEXT NOT NULL,"
+                " changed_on TEXT,"
+                " PRIMARY KEY (object_class, deploy_name))"
+            )
+
+    @staticmethod
+    def registry_path(env: str) -> str:
+        return os.path.join('Deployer', f"{env}.uuid_registry.sqlite")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn: sqlite3.Connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def uuid_for(self, object_class: str, deploy_name: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT uuid FROM uuid_registry WHERE object_class = ? AND deploy_name = ?",
+                (object_class, deploy_name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_uuid_map(self) -> dict[str, bidict]:
+        uuid_map: dict[str, bidict] = {object_class: bidict() for object_class in OBJECT_CLASSES}
+        with self._connect() as conn:
+            for object_class, uuid, deploy_name in conn.execute(
+                    "SELECT object_class, uuid, deploy_name FROM uuid_registry"):
+                uuid_map.setdefault(object_class, bidict())[uuid] = deploy_name
+        return uuid_map
+
+    def update(self, uuid_map: dict[str, dict[str, str]]) -> None:
+        # INSERT OR REPLACE also drops the previous uuid of a deploy name that got a new one
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO uuid_registry (object_class, uuid, deploy_name) VALUES (?, ?, ?)",
+                [(object_class, uuid, deploy_name)
+                 for object_class, uuids in uuid_map.items() for uuid, deploy_name in uuids.items()]
+            )
+
+    def forget(self, object_class: str, deploy_name: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM uuid_registry WHERE object_class = ? AND deploy_name = ?",
+                         (object_class, deploy_name))
+
+    def import_states(self, object_class: str) -> dict[str, tuple[str, Optional[str]]]:
+        with self._connect() as conn:
+            return {deploy_name: (content_hash, changed_on) for deploy_name, content_hash, changed_on in conn.execute(
+                "SELECT deploy_name, content_hash, changed_on FROM import_state WHERE object_class = ?",
+                (object_class,)
+            )}
+
+    def record_imports(self, object_class: str, states: dict[str, tuple[str, Optional[str]]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO import_state (object_class, deploy_name, content_hash, changed_on) "
+                "VALUES (?, ?, ?, ?)",
+                [(object_class, deploy_name, content_hash, changed_on)
+                 for deploy_name, (content_hash, changed_on) in states.items()]
+            )
@@ -1,11 +1,26 @@
 import json
+import logging
+import math
+import time
 
 import requests
-import yaml
 import os
 import io
+import tempfile
 from functools import cached_property
+from typing import BinaryIO, Optional
+from SupersetApiClient.bundle import AdaptiveChunker, merge_export_bundles
+from SupersetApiClient import yaml_codec
 from SupersetApiClient.data_model import DataModel
+from SupersetApiClient.mirror import ObjectMirror
+
+EXPORT_CHUNK_SIZE: int = 1024 * 1024
+EXPORT_SPOOL_MAX_SIZE: int = 64 * 1024 * 1024
+EXPORT_FILE_EXTENSIONS: dict[str, str] = {
+    "application/text": "yaml",
+    "application/json": "json",
+    "application/zip": "zip",
+}
 
 
 class ApiObject:
@@ -14,6 +29,7 @@ class ApiObject:
 
     def __init__(self, client):
         self.client = client
+        self.uuid_ids: dict[str, int] = {}
 
     @property
     def api_endpoint(self) -> str:
@@ -44,10 +60,15 @@ class ApiObject:
         )
 
     def get_list(self, q: dict[str, any]) -> str:
+        result: list[dict[str, any]] = self.get_list_response(q)['result']
+        self.remember_uuids(result)
+        return result
+
+    def get_list_response(self, q: dict[str, any]) -> dict[str, any]:
         return self.client.get(
             self.api_endpoint,
             params={'q': json.dumps(q)}
-        ).json()['result']
+        ).json()
 
     def get(self, id: int) -> DataModel:
         res = self.client.get(
@@ -55,26 +76,189 @@ class ApiObject:
         ).json()['result']
         return self.data_model.from_json(res, self)
 
-    def find_all(self, page_size: int = 100, **kwargs) -> list[DataModel]:
+    def find_all(self,
+                 page_size: int = 100,
+                 columns: list[str] = None,
+                 lazy: bool = False,
+                 **kwargs
+                 ) -> list[DataModel]:
+        if self.mirror is not None and not kwargs and not columns:
+            return self.mirror.sync(page_size)
+        columns = self._projection(columns)
+        return [self.data_model.from_json(obj, self, columns, lazy)
+                for obj in self.list_all(page_size, columns=columns, **kwargs)]
+
+    def list_all(self,
+                 page_size: int = 100,
+                 filters: list[dict[str, any]] = None,
+                 columns: list[str] = None,
+                 **kwargs
+                 ) -> list[dict[str, any]]:
+        if self.client.max_workers > 1:
+            return self._list_all_concurrent(page_size, filters, columns, **kwargs)
         page: int = 0
-        curr_l: list[DataModel] = self.find_by_page(page, page_size, **kwargs)
-        objs: list[DataModel] = []
+        curr_l: list[dict[str, any]] = self.get_list(q=self._page_query(page, page_size, filters, columns, **kwargs))
+        objs: list[dict[str, any]] = []
         while curr_l:
             objs.extend(curr_l)
             page += 1
-            curr_l = self.find_by_page(page, page_size, **kwargs)
+            curr_l = self.get_list(q=self._page_query(page, page_size, filters, columns, **kwargs))
         return objs
 
-    def find_by_name(self, name: str, page_size: int = 100) -> list[DataModel]:
-        return self.find_all(page_size, **{self.data_model.name_field(): name})
+    def _list_all_concurrent(self,
+                             page_size: int = 100,
+                             filters: list[dict[str, any]] = None,
+                             columns: list[str] = None,
+                             **kwargs
+                             ) -> list[dict[str, any]]:
+        first_page: dict[str, any] = self.get_list_response(
+            q=self._page_query(0, page_size, filters, columns, **kwargs)
+        )
+        self.remember_uuids(first_page['result'])
+        objs: list[dict[str, any]] = list(first_page['result'])
+        # the server caps page_size, so the pages are counted with the size it actually returned
+        page_size = len(objs) or page_size
+        page_count: int = math.ceil(first_page['count'] / page_size)
+        pages: list[list[dict[str, any]]] = self.client.map_concurrent(
+            lambda page: self.get_list(q=self._page_query(page, page_size, filters, columns, **kwargs)),
+            range(1, page_count)
+        )
+        for page_objs in pages:
+            objs.extend(page_objs)
+        # objects created while listing push the count past the last page
+        page: int = page_count
+        while len(objs) < first_page['count']:
+            curr_l: list[dict[str, any]] = self.get_list(
+                q=self._page_query(page, page_size, filters, columns, **kwargs)
+            )
+            if not curr_l:
+                break
+            objs.extend(curr_l)
+            page += 1
+        return objs
 
-    def find_by_page(self, page: int = 0, page_size: int = 100, **kwargs) -> list[DataModel]:
+    @cached_property
+    def mirror(self) -> Optional[ObjectMirror]:
+        if not self.client.mirror_path:
+            return None
+        return ObjectMirror(self, self.client.mirror_path)
+
+    def find_by_name(self,
+                     name: str,
+                     page_size: int = 100,
+                     columns: list[str] = None,
+                     lazy: bool = False
+                     ) -> list[DataModel]:
+        return self.find_all(page_size, columns, lazy, **{self.data_model.name_field(): name})
+
+    @staticmethod
+    def _projection(columns: list[str] = None) -> list[str]:
+        if not columns:
+            return None
+        return columns if 'id' in columns else ['id', *columns]
+
+    @staticmethod
+    def _page_query(page: int = 0,
+                    page_size: int = 100,
+                    filters: list[dict[str, any]] = None,
+                    columns: list[str] = None,
+                    **kwargs
+                    ) -> dict[str, any]:
         query: dict[str, any] = dict(
             page=page,
             page_size=page_size,
-            filters=[dict(col=k, opr='eq', value=v) for k, v in kwargs.items()]
+            order_column='id',
+            order_direction='asc',
+            filters=[*(filters or []), *(dict(col=k, opr='eq', value=v) for k, v in kwargs.items())]
         )
-        return [self.data_model.from_json(obj, self) for obj in self.get_list(q=query)]
+        if columns:
+            query['columns'] = columns
+        return query
+
+    @staticmethod
+    def _id_chunks(ids: list[int], chunk_size: int) -> list[list[int]]:
+        uniq_ids: list[int] = list(dict.fromkeys(ids))
+        return [uniq_ids[i:i + chunk_size] for i in range(0, len(uniq_ids), chunk_size)]
+
+    def get_many(self, ids: list[int], chunk_size: int = 100, concurrent: bool = True) -> list[DataModel]:
+        def get_chunk(chunk: list[int]) -> list[dict[str, any]]:
+            return self.get_list(q=self._page_query(0, len(chunk), filters=[dict(col='id', opr='in', value=chunk)]))
+
+        chunks: list[list[int]] = self._id_chunks(ids, chunk_size)
+        pages: list[list[dict[str, any]]] = self.client.map_concurrent(get_chunk, chunks) if concurrent \
+            else [get_chunk(chunk) for chunk in chunks]
+        objs_by_id: dict[int, dict[str, any]] = {obj['id']: obj for page in pages for obj in page}
+        return [self.data_model.from_json(objs_by_id[obj_id], self) for obj_id in ids if obj_id in objs_by_id]
+
+    def remember_uuids(self, objects: list[dict[str, any]]) -> None:
+        for obj in objects:
+            if obj.get('uuid') and obj.get('id') is not None:
+                self.uuid_ids[obj['uuid']] = obj['id']
+
+    def list_by_uuid(self,
+                     uuids: list[str],
+                     columns: list[str] = None,
+                     chunk_size: int = 100,
+                     concurrent: bool = True
+                     ) -> list[dict[str, any]]:
+        def list_chunk(chunk: list[str]) -> list[dict[str, any]]:
+            # get_list fills the uuid cache
+            return self.get_list(q=self._page_query(0, len(chunk), filters=[dict(col='uuid', opr='in', value=chunk)],
+                                                    columns=['id', 'uuid', *(columns or [])]))
+
+        chunks: list[list[str]] = self._id_chunks(uuids, chunk_size)
+        pages: list[list[dict[str, any]]] = self.client.map_concurrent(list_chunk, chunks) if concurrent \
+            else [list_chunk(chunk) for chunk in chunks]
+        return [obj for page in pages for obj in page]
+
+    def _resolve_uuids(self, uuids: list[str], chunk_size: int = 100, concurrent: bool = True) -> None:
+        self.list_by_uuid([uuid for uuid in uuids if uuid not in self.uuid_ids], chunk_size=chunk_size,
+                          concurrent=concurrent)
+
+    def id_for_uuid(self, uuid: str) -> Optional[int]:
+        self._resolve_uuids([uuid])
+        return self.uuid_ids.get(uuid)
+
+    def get_by_uuid(self, uuid: str, retry_stale: bool = True) -> Optional[DataModel]:
+        obj_id: Optional[int] = self.id_for_uuid(uuid)
+        if obj_id is None:
+            return None
+        response: requests.Response = self.client.get(f"{self.api_endpoint}/{obj_id}")
+        if response.status_code == 404:
+            # the object was deleted or recreated since its id was cached
+            self.uuid_ids.pop(uuid, None)
+            return self.get_by_uuid(uuid, False) if retry_stale else None
+        response.raise_for_status()
+        return self.data_model.from_json(response.json()['result'], self)
+
+    def get_many_by_uuid(self,
+                         uuids: list[str],
+                         chunk_size: int = 100,
+                         concurrent: bool = True,
+                         retry_stale: bool = True
+                         ) -> list[DataModel]:
+        self._resolve_uuids(uuids, chunk_size, concurrent)
+        ids: list[int] = [self.uuid_ids[uuid] for uuid in uuids if uuid in self.uuid_ids]
+        objs: list[DataModel] = self.get_many(ids, chunk_size, concurrent)
+        found_ids: set[int] = {obj.id for obj in objs}
+        stale_uuids: list[str] = [uuid for uuid in uuids if uuid in self.uuid_ids
+                                  and self.uuid_ids[uuid] not in found_ids]
+        if stale_uuids and retry_stale:
+            for uuid in stale_uuids:
+                self.uuid_ids.pop(uuid, None)
+            return self.get_many_by_uuid(uuids, chunk_size, concurrent, False)
+        return objs
+
+    def find_by_page(self,
+                     page: int = 0,
+                     page_size: int = 100,
+                     columns: list[str] = None,
+                     lazy: bool = False,
+                     **kwargs
+                     ) -> list[DataModel]:
+        columns = self._projection(columns)
+        query: dict[str, any] = self._page_query(page, page_size, columns=columns, **kwargs)
+        return [self.data_model.from_json(obj, self, columns, lazy) for obj in self.get_list(q=query)]
 
     def count(self) -> int:
         return self.client.get(
@@ -88,16 +272,42 @@ class ApiObject:
         obj.api_object = self
         return obj.id
 
-    def export_to_file(self, ids: list[int], dir_path: str, filename: str) -> str:
+    @staticmethod
+    def _export_file_ext(content_type: str) -> str:
+        for content_prefix, file_ext in EXPORT_FILE_EXTENSIONS.items():
+            if content_type.startswith(content_prefix):
+                return file_ext
+        raise ValueError(f"Unknown content type {content_type}")
+
+    def _export_request(self, ids: list[int], stream: bool = False) -> requests.Response:
         ids_array = ",".join([str(i) for i in ids])
-        response = self.client.get(self.export_endpoint, params={"q": f"[{ids_array}]"})
+        return self.client.get(self.export_endpoint, params={"q": f"[{ids_array}]"}, stream=stream)
+
+    def export_to_stream(self, ids: list[int], writable: BinaryIO, chunk_size: int = EXPORT_CHUNK_SIZE) -> str:
+        with self._export_request(ids, stream=True) as response:
+            response.raise_for_status()
+            file_ext: str = self._export_file_ext(response.headers["content-type"].strip())
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                writable.write(chunk)
+        return file_ext
+
+    def export_to_file(self, ids: list[int], dir_path: str, filename: str, stream: bool = False) -> str:
         file_path: str = os.path.join(dir_path, filename)
+        if stream:
+            with self._export_request(ids, stream=True) as response:
+                response.raise_for_status()
+                file_path += f".{self._export_file_ext(response.headers['content-type'].strip())}"
+                with open(file_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=EXPORT_CHUNK_SIZE):
+                        f.write(chunk)
+            return file_path
+        response = self._export_request(ids)
         content_type = response.headers["content-type"].strip()
         if content_type.startswith("application/text"):
-            data = yaml.load(response.text, Loader=yaml.FullLoader)
+            data = yaml_codec.load(response.text)
             file_path += ".yaml"
             with open(file_path, "w", encoding="utf-8") as f:
-                yaml.dump(data, f, default_flow_style=False)
+                yaml_codec.dump(data, f, default_flow_style=False)
         elif content_type.startswith("application/json"):
             data = response.json()
             file_path += ".json"
@@ -113,13 +323,12 @@ class ApiObject:
         return file_path
 
     def export_to_buffer(self, ids: list[int]) -> io.BytesIO:
-        ids_array = ",".join([str(i) for i in ids])
-        response = self.client.get(self.export_endpoint, params={"q": f"[{ids_array}]"})
+        response = self._export_request(ids)
         content_type = response.headers["content-type"].strip()
         buffer = io.BytesIO()
         if content_type.startswith("application/text"):
-            data = yaml.load(response.text, Loader=yaml.FullLoader)
-            yaml.dump(data, buffer, default_flow_style=False)
+            data = yaml_codec.load(response.text)
+            yaml_codec.dump(data, buffer, default_flow_style=False)
         elif content_type.startswith("application/json"):
             data = response.json()
             json.dump(data, buffer, ensure_ascii=False, indent=4)
@@ -129,6 +338,48 @@ class ApiObject:
             raise ValueError(f"Unknown content type {content_type}")
         return buffer
 
+    def export_to_spooled_file(self, ids: list[int], max_memory_size: int = EXPORT_SPOOL_MAX_SIZE) -> BinaryIO:
+        spooled_file = tempfile.SpooledTemporaryFile(max_size=max_memory_size)
+        self.export_to_stream(ids, spooled_file)
+        spooled_file.seek(0)
+        return spooled_file
+
+    def _export_chunk(self, ids: list[int]) -> tuple[BinaryIO, float, int]:
+        started: float = time.perf_counter()
+        spooled_file: BinaryIO = self.export_to_spooled_file(ids)
+        payload_bytes: int = spooled_file.seek(0, io.SEEK_END)
+        spooled_file.seek(0)
+        return spooled_file, time.perf_counter() - started, payload_bytes
+
+    def export_bulk(self, ids: list[int], output: BinaryIO = None, chunker: AdaptiveChunker = None) -> BinaryIO:
+        chunker = chunker or AdaptiveChunker()
+        pending: list[int] = list(dict.fromkeys(ids))
+        bundles: list[BinaryIO] = []
+        # every spooled chunk is tracked as soon as it is fetched, a failing chunk of a wave must not leak the others
+        fetched: list[BinaryIO] = []
+
+        def export_chunk(chunk: list[int]) -> tuple[BinaryIO, float, int]:
+            exported: tuple[BinaryIO, float, int] = self._export_chunk(chunk)
+            fetched.append(exported[0])
+            return exported
+
+        try:
+            while pending:
+                chunks: list[list[int]] = []
+                while pending and len(chunks) < max(self.client.max_workers, 1):
+                    chunk, pending = chunker.take(pending)
+                    chunks.append(chunk)
+                for chunk, (bundle, elapsed, payload_bytes) in zip(
+                        chunks, self.client.map_concurrent(export_chunk, chunks)):
+                    bundles.append(bundle)
+                    chunker.observe(len(chunk), elapsed, payload_bytes)
+                logging.info(f"Export {self.object_type}: {len(ids) - len(pending)}/{len(ids)} objects, "
+                             f"next chunk size {chunker.size}")
+            return merge_export_bundles(bundles, output)
+        finally:
+            for bundle in fetched:
+                bundle.close()
+
     def import_from_buffer(self, buffer: io.BytesIO, overwrite: bool = False, passwords=None) -> requests.Response:
         passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
         buffer.seek(0)
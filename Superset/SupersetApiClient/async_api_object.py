@@ -0,0 +1,228 @@
+from __future__ import annotations
+import json
+import math
+
+import os
+import io
+from typing import TYPE_CHECKING
+from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient import yaml_codec
+from SupersetApiClient.data_model import DataModel
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class AsyncApiObject:
+    object_type: str = "unknown"
+    data_model: DataModel = None
+
+    def __init__(self, client):
+        self.client = client
+        self._info: dict[str, any] = None
+
+    @property
+    def api_endpoint(self) -> str:
+        return f"{self.client.api_endpoint}/{self.object_type}"
+
+    @property
+    def export_endpoint(self) -> str:
+        return f"{self.api_endpoint}/export/"
+
+    @property
+    def import_endpoint(self) -> str:
+        return f"{self.api_endpoint}/import/"
+
+    @property
+    def info_endpoint(self) -> str:
+        return f"{self.api_endpoint}/_info"
+
+    async def delete(self, ids: list[int]) -> httpx.Response:
+        return await self.client.delete(
+            self.api_endpoint,
+            params={'q': json.dumps(ids)}
+        )
+
+    async def put(self, obj_id: int, **request_body_kwargs) -> httpx.Response:
+        return await self.client.put(
+            url=f"{self.api_endpoint}/{obj_id}",
+            json=request_body_kwargs
+        )
+
+    async def get_list(self, q: dict[str, any]) -> list[dict[str, any]]:
+        return (await self.get_list_response(q))['result']
+
+    async def get_list_response(self, q: dict[str, any]) -> dict[str, any]:
+        response = await self.client.get(
+            self.api_endpoint,
+            params={'q': json.dumps(q)}
+        )
+        return response.json()
+
+    async def get(self, id: int) -> DataModel:
+        response = await self.client.get(f"{self.api_endpoint}/{id}")
+        return self.data_model.from_json(response.json()['result'], self)
+
+    async def find_all(self,
+                       page_size: int = 100,
+                       columns: list[str] = None,
+                       lazy: bool = False,
+                       **kwargs
+                       ) -> list[DataModel]:
+        columns = ApiObject._projection(columns)
+        first_page: dict[str, any] = await self.get_list_response(
+            q=ApiObject._page_query(0, page_size, columns=columns, **kwargs)
+        )
+        # the server caps page_size, so the pages are counted with the size it actually returned
+        page_size = len(first_page['result']) or page_size
+        page_count: int = math.ceil(first_page['count'] / page_size)
+        pages: list[list[DataModel]] = await self.client.map_concurrent(
+            lambda page: self.find_by_page(page, page_size, columns, lazy, **kwargs),
+            range(1, page_count)
+        )
+        objs: list[DataModel] = [self.data_model.from_json(obj, self, columns, lazy) for obj in first_page['result']]
+        for page_objs in pages:
+            objs.extend(page_objs)
+        # objects created while listing push the count past the last page
+        page: int = page_count
+        while len(objs) < first_page['count']:
+            curr_l: list[DataModel] = await self.find_by_page(page, page_size, columns, lazy, **kwargs)
+            if not curr_l:
+                break
+            objs.extend(curr_l)
+            page += 1
+        return objs
+
+    async def find_by_name(self,
+                           name: str,
+                           page_size: int = 100,
+                           columns: list[str] = None,
+                           lazy: bool = False
+                           ) -> list[DataModel]:
+        return await self.find_all(page_size, columns, lazy, **{self.data_model.name_field(): name})
+
+    async def find_by_page(self,
+                           page: int = 0,
+                           page_size: int = 100,
+                           columns: list[str] = None,
+                           lazy: bool = False,
+                           **kwargs
+                           ) -> list[DataModel]:
+        columns = ApiObject._projection(columns)
+        query: dict[str, any] = ApiObject._page_query(page, page_size, columns=columns, **kwargs)
+        return [self.data_model.from_json(obj, self, columns, lazy) for obj in await self.get_list(q=query)]
+
+    async def get_many(self, ids: list[int], chunk_size: int = 100) -> list[DataModel]:
+        async def get_chunk(chunk: list[int]) -> list[dict[str, any]]:
+            return await self.get_list(
+                q=ApiObject._page_query(0, len(chunk), filters=[dict(col='id', opr='in', value=chunk)])
+            )
+
+        pages: list[list[dict[str, any]]] = await self.client.map_concurrent(
+            get_chunk, ApiObject._id_chunks(ids, chunk_size)
+        )
+        objs_by_id: dict[int, dict[str, any]] = {obj['id']: obj for page in pages for obj in page}
+        return [self.data_model.from_json(objs_by_id[obj_id], self) for obj_id in ids if obj_id in objs_by_id]
+
+    async def count(self) -> int:
+        response = await self.client.get(f"{self.api_endpoint}")
+        return response.json()['count']
+
+    async def add(self, obj: DataModel) -> int:
+        o = obj.to_json(columns=await self.get_add_columns())
+        response = await self.client.post(self.api_endpoint, json=o)
+        obj.id = response.json().get("id")
+        obj.api_object = self
+        return obj.id
+
+    async def refresh(self, obj: DataModel) -> DataModel:
+        response = await self.client.get(obj.api_endpoint)
+        return obj.update_from_json(response.json().get("result"))
+
+    async def save(self, obj: DataModel) -> DataModel:
+        json_obj = obj.to_json(columns=await self.get_edit_columns())
+        await self.client.put(obj.api_endpoint, json=json_obj)
+        return obj
+
+    async def delete_object(self, obj: DataModel) -> bool:
+        response = await self.client.delete(obj.api_endpoint)
+        return response.json().get("message") == "OK"
+
+    async def export_to_file(self, ids: list[int], dir_path: str, filename: str) -> str:
+        ids_array = ",".join([str(i) for i in ids])
+        response = await self.client.get(self.export_endpoint, params={"q": f"[{ids_array}]"})
+        file_path: str = os.path.join(dir_path, filename)
+        content_type = response.headers["content-type"].strip()
+        if content_type.startswith("application/text"):
+            data = yaml_codec.load(response.text)
+            file_path += ".yaml"
+            with open(file_path, "w", encoding="utf-8") as f:
+                yaml_codec.dump(data, f, default_flow_style=False)
+        elif content_type.startswith("application/json"):
+            data = response.json()
+            file_path += ".json"
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        elif content_type.startswith("application/zip"):
+            file_path += ".zip"
+            with open(file_path, "wb") as f:
+                f.write(response.content)
+        else:
+            raise ValueError(f"Unknown content type {content_type}")
+        return file_path
+
+    async def export_to_buffer(self, ids: list[int]) -> io.BytesIO:
+        ids_array = ",".join([str(i) for i in ids])
+        response = await self.client.get(self.export_endpoint, params={"q": f"[{ids_array}]"})
+        content_type = response.headers["content-type"].strip()
+        buffer = io.BytesIO()
+        if content_type.startswith("application/text"):
+            data = yaml_codec.load(response.text)
+            buffer.write(yaml_codec.dump(data, default_flow_style=False, encoding="utf-8"))
+        elif content_type.startswith("application/json"):
+            buffer.write(json.dumps(response.json(), ensure_ascii=False, indent=4).encode("utf-8"))
+        elif content_type.startswith("application/zip"):
+            buffer.write(response.content)
+        else:
+            raise ValueError(f"Unknown content type {content_type}")
+        return buffer
+
+    async def import_from_buffer(self, buffer: io.BytesIO, overwrite: bool = False, passwords=None) -> httpx.Response:
+        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
+        buffer.seek(0)
+        response = await self.client.post(
+            self.import_endpoint,
+            files=dict(formData=("import_from_buffer.zip", buffer, "application/zip")),
+            data=dict(overwrite=json.dumps(overwrite), passwords=json.dumps(passwords)),
+            headers={"Accept": "application/json"},
+        )
+        response.raise_for_status()
+        return response
+
+    async def import_from_file(self, file_path: str, overwrite: bool = False, passwords=None) -> httpx.Response:
+        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
+        file_ext = os.path.splitext(file_path)[-1].lstrip(".").lower()
+        with open(file_path, "rb") as f:
+            response = await self.client.post(
+                self.import_endpoint,
+                files=dict(formData=(os.path.basename(file_path), f, f"application/{file_ext}")),
+                data=dict(overwrite=json.dumps(overwrite), passwords=json.dumps(passwords)),
+                headers={"Accept": "application/json"},
+            )
+        response.raise_for_status()
+        return response
+
+    async def info(self) -> dict[str, any]:
+        if self._info is None:
+            response = await self.client.get(
+                self.info_endpoint,
+                params={"q": json.dumps({"keys": ["add_columns", "edit_columns"]})}
+            )
+            self._info = response.json()
+        return self._info
+
+    async def get_add_columns(self) -> list[str]:
+        return [e.get("name") for e in (await self.info()).get("add_columns", [])]
+
+    async def get_edit_columns(self) -> list[str]:
+        return [e.get("name") for e in (await self.info()).get("edit_columns", [])]
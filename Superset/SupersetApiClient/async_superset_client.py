@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import logging
+import httpx
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+from SupersetApiClient.auth import TokenAuthBase
+from SupersetApiClient.charts import AsyncCharts
+from SupersetApiClient.dashboards import AsyncDashboards
+from SupersetApiClient.databases import AsyncDatabases
+from SupersetApiClient.datasets import AsyncDatasets
+from SupersetApiClient.token_cache import DEFAULT_TOKEN_CACHE_PATH, TokenCache
+from SupersetApiClient.transport import RetryPolicy, TransportConfig
+
+
+class AsyncSupersetAuth(TokenAuthBase):
+    def __init__(self,
+                 api_endpoint: str,
+                 username: str,
+                 password: str,
+                 session: httpx.AsyncClient,
+                 token_cache: TokenCache
+                 ):
+        super().__init__(api_endpoint, username, password, token_cache)
+        self.session = session
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def _use(self, tokens: dict[str, any]) -> dict[str, any]:
+        self.session.cookies.update(tokens.get("cookies") or {})
+        self.tokens = tokens
+        return tokens
+
+    async def _login(self) -> dict[str, any]:
+        login_response = await self.session.post(
+            url=f"{self.api_endpoint}/security/login",
+            json=self._login_body()
+        )
+        login_res: dict[str, any] = login_response.json()
+        csrf_response = await self.session.get(
+            url=f"{self.api_endpoint}/security/csrf_token/",
+            headers={'Authorization': f'Bearer {login_res["access_token"]}'}
+        )
+        logging.info(f"Logged in to {self.api_endpoint} as {self.username}")
+        return dict(access_token=login_res["access_token"],
+                    refresh_token=login_res.get("refresh_token"),
+                    csrf_token=csrf_response.json()["result"])
+
+    async def _refresh(self, tokens: dict[str, any]) -> Optional[dict[str, any]]:
+        if not self._can_refresh(tokens):
+            return None
+        response = await self.session.post(
+            url=f"{self.api_endpoint}/security/refresh",
+            headers={'Authorization': f'Bearer {tokens["refresh_token"]}'}
+        )
+        if not response.is_success:
+            return None
+        return {**tokens, "access_token": response.json()["access_token"]}
+
+    @contextlib.asynccontextmanager
+    async def _cache_lock(self) -> AsyncIterator[None]:
+        # flock blocks until other processes are done, so it is taken and released off the event loop
+        lock: contextlib.AbstractContextManager = self.token_cache.lock()
+        acquired: asyncio.Future = asyncio.get_running_loop().run_in_executor(None, lock.__enter__)
+        try:
+            await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            # the worker still takes the lock, it is released as soon as it has it
+            acquired.add_done_callback(lambda f: not f.cancelled() and f.exception() is None and lock.__exit__(None, None, None))
+            raise
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+
+    async def ensure_tokens(self, force_login: bool = False) -> dict[str, any]:
+        # same flow as SupersetAuth.ensure_tokens, so sync and async clients share the cached tokens
+        async with self._lock:
+            if not force_login and self._is_fresh(self.tokens):
+                return self.tokens
+            async with self._cache_lock():
+                cached: Optional[dict[str, any]] = await asyncio.to_thread(self.token_cache.load, self.cache_key)
+                if not force_login and self._is_fresh(cached):
+                    return self._use(cached)
+                if cached:
+                    self._use(cached)
+                tokens: Optional[dict[str, any]] = None if force_login or not cached else await self._refresh(cached)
+                if tokens is None:
+                    tokens = await self._login()
+                tokens["cookies"] = {cookie.name: cookie.value for cookie in self.session.cookies.jar}
+                await asyncio.to_thread(self.token_cache.store, self.cache_key, tokens)
+                return self._use(tokens)
+
+
+class AsyncSupersetClient:
+
+    def __init__(self,
+                 api_endpoint: str,
+                 username: str,
+                 password: str,
+                 max_workers: int = 8,
+                 transport: dict[str, any] = None,
+                 token_cache_path: str = DEFAULT_TOKEN_CACHE_PATH
+                 ):
+        self.api_endpoint = api_endpoint
+        self.username = username
+        self.password = password
+        self.max_workers = max_workers
+        self.transport_config = TransportConfig(**(transport or {}))
+        self.retry_policy = RetryPolicy(self.transport_config)
+        self.token_cache = TokenCache(token_cache_path)
+
+        self.dashboards = AsyncDashboards(self)
+        self.datasets = AsyncDatasets(self)
+        self.charts = AsyncCharts(self)
+        self.databases = AsyncDatabases(self)
+
+        self._session: httpx.AsyncClient = None
+        self.auth: AsyncSupersetAuth = None
+        self._session_lock: asyncio.Lock = asyncio.Lock()
+
+    async def __aenter__(self) -> 'AsyncSupersetClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def session(self) -> httpx.AsyncClient:
+        async with self._session_lock:
+            if self._session is None:
+                api_session = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=self.transport_config.pool_size,
+                                        max_keepalive_connections=self.transport_config.pool_size),
+                    timeout=httpx.Timeout(self.transport_config.read_timeout,
+                                          connect=self.transport_config.connect_timeout)
+                )
+                api_session.headers.update({'accept': 'application/json'})
+                # tokens are fetched lazily, refreshed before they expire and shared through the token cache
+                self.auth = AsyncSupersetAuth(self.api_endpoint, self.username, self.password,
+                                              api_session, self.token_cache)
+                self._session = api_session
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+            self.auth = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        session: httpx.AsyncClient = await self.session()
+        attempt: int = 0
+        auth_retried: bool = False
+        while True:
+            for file_spec in (kwargs.get('files') or {}).values():
+                if hasattr(file_spec[1], 'seek'):
+                    file_spec[1].seek(0)
+            tokens: dict[str, any] = await self.auth.ensure_tokens()
+            headers: dict[str, str] = {**(kwargs.get('headers') or {}), **self.auth.auth_headers(tokens)}
+            try:
+                response = await session.request(method, url, **{**kwargs, 'headers': headers})
+            except httpx.TransportError as e:
+                connect_error: bool = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not self.retry_policy.is_retryable_error(method, connect_error) \
+                        or not self.retry_policy.should_retry(attempt):
+                    raise
+                delay: float = self.retry_policy.backoff(attempt)
+                logging.warning(f"{method} {url} failed ({e}), retry in {delay:.1f}s")
+            else:
+                if response.status_code == 401 and not auth_retried:
+                    logging.info(f"Access token for {self.api_endpoint} was rejected, logging in again")
+                    auth_retried = True
+                    await self.auth.ensure_tokens(force_login=True)
+                    continue
+                if not self.retry_policy.is_retryable_status(response.status_code, method,
+                                                             response.headers.get('Retry-After')) \
+                        or not self.retry_policy.should_retry(attempt):
+                    return response
+                delay: float = self.retry_policy.backoff(attempt, response.headers.get('Retry-After'))
+                logging.warning(f"{method} {url} returned {response.status_code}, retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def map_concurrent(self, func: Callable[..., Awaitable], *iterables: Iterable) -> list:
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(max(self.max_workers, 1))
+
+        async def run(*args):
+            async with semaphore:
+                return await func(*args)
+
+        return list(await asyncio.gather(*(run(*args) for args in zip(*iterables))))
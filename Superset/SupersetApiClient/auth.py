@@ -0,0 +1,150 @@
+import base64
+import json
+import logging
+import threading
+import time
+from typing import Optional
+import requests
+from requests.auth import AuthBase
+from SupersetApiClient.token_cache import TokenCache
+
+
+def _no_auth(r: requests.PreparedRequest) -> requests.PreparedRequest:
+    return r
+
+
+def jwt_expires_at(token: str) -> float:
+    try:
+        payload: str = token.split(".")[1]
+        claims: dict[str, any] = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, ValueError):
+        return 0.0
+
+
+class TokenAuthBase:
+    REFRESH_MARGIN_SECONDS: int = 60
+
+    def __init__(self,
+                 api_endpoint: str,
+                 username: str,
+                 password: str,
+                 token_cache: TokenCache
+                 ):
+        self.api_endpoint = api_endpoint
+        self.username = username
+        self.password = password
+        self.token_cache = token_cache
+        self.cache_key = TokenCache.cache_key(api_endpoint, username)
+        self.tokens: Optional[dict[str, any]] = None
+
+    def _is_fresh(self, tokens: Optional[dict[str, any]]) -> bool:
+        return bool(tokens) and \
+            jwt_expires_at(tokens["access_token"]) - time.time() > self.REFRESH_MARGIN_SECONDS
+
+    @staticmethod
+    def _can_refresh(tokens: dict[str, any]) -> bool:
+        refresh_token: str = tokens.get("refresh_token")
+        return bool(refresh_token) and jwt_expires_at(refresh_token) > time.time()
+
+    def _login_body(self) -> dict[str, any]:
+        return {
+            "username": self.username,
+            "password": self.password,
+            "refresh": True,
+            "provider": "db"
+        }
+
+    @staticmethod
+    def auth_headers(tokens: dict[str, any]) -> dict[str, str]:
+        return {'Authorization': f'Bearer {tokens["access_token"]}', 'X-CSRFToken': tokens["csrf_token"]}
+
+
+class SupersetAuth(TokenAuthBase, AuthBase):
+    def __init__(self,
+                 api_endpoint: str,
+                 username: str,
+                 password: str,
+                 session: requests.Session,
+                 token_cache: TokenCache
+                 ):
+        super().__init__(api_endpoint, username, password, token_cache)
+        self.session = session
+        self._lock = threading.Lock()
+
+    def _use(self, tokens: dict[str, any]) -> dict[str, any]:
+        self.session.cookies.update(tokens.get("cookies") or {})
+        self.tokens = tokens
+        return tokens
+
+    def _login(self) -> dict[str, any]:
+        login_res: dict[str, any] = self.session.post(
+            url=f"{self.api_endpoint}/security/login",
+            json=self._login_body(),
+            auth=_no_auth
+        ).json()
+        csrf_token: str = self.session.get(
+            url=f"{self.api_endpoint}/security/csrf_token/",
+            headers={'Authorization': f'Bearer {login_res["access_token"]}'},
+            auth=_no_auth
+        ).json()["result"]
+        logging.info(f"Logged in to {self.api_endpoint} as {self.username}")
+        return dict(access_token=login_res["access_token"],
+                    refresh_token=login_res.get("refresh_token"),
+                    csrf_token=csrf_token)
+
+    def _refresh(self, tokens: dict[str, any]) -> Optional[dict[str, any]]:
+        if not self._can_refresh(tokens):
+            return None
+        response: requests.Response = self.session.post(
+            url=f"{self.api_endpoint}/security/refresh",
+            headers={'Authorization': f'Bearer {tokens["refresh_token"]}'},
+            auth=_no_auth
+        )
+        if not response.ok:
+            return None
+        return {**tokens, "access_token": response.json()["access_token"]}
+
+    def ensure_tokens(self, force_login: bool = False) -> dict[str, any]:
+        with self._lock:
+            if not force_login and self._is_fresh(self.tokens):
+                return self.tokens
+            with self.token_cache.lock():
+                # another process may have refreshed the tokens in the meantime
+                cached: Optional[dict[str, any]] = self.token_cache.load(self.cache_key)
+                if not force_login and self._is_fresh(cached):
+                    return self._use(cached)
+                if cached:
+                    self._use(cached)
+                tokens: Optional[dict[str, any]] = None if force_login or not cached else self._refresh(cached)
+                if tokens is None:
+                    tokens = self._login()
+                tokens["cookies"] = requests.utils.dict_from_cookiejar(self.session.cookies)
+                self.token_cache.store(self.cache_key, tokens)
+                return self._use(tokens)
+
+    def _set_headers(self, r: requests.PreparedRequest, tokens: dict[str, any]) -> None:
+        r.headers.update(self.auth_headers(tokens))
+        # the CSRF token is bound to the session cookie restored from the cache
+        r.headers.pop('Cookie', None)
+        r.prepare_cookies(self.session.cookies)
+
+    def _handle_unauthorized(self, response: requests.Response, **kwargs) -> requests.Response:
+        if response.status_code != 401 or getattr(response.request, 'superset_auth_retry', False):
+            return response
+        logging.info(f"Access token for {self.api_endpoint} was rejected, logging in again")
+        tokens: dict[str, any] = self.ensure_tokens(force_login=True)
+        response.content
+        response.close()
+        retry_request: requests.PreparedRequest = response.request.copy()
+        retry_request.superset_auth_retry = True
+        self._set_headers(retry_request, tokens)
+        retry_response: requests.Response = response.connection.send(retry_request, **kwargs)
+        retry_response.history.append(response)
+        retry_response.request = retry_request
+        return retry_response
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        self._set_headers(r, self.ensure_tokens())
+        r.register_hook('response', self._handle_unauthorized)
+        return r
@@ -0,0 +1,83 @@
+import posixpath
+import tempfile
+import zipfile
+from typing import BinaryIO, Iterable
+from SupersetApiClient import yaml_codec
+
+BUNDLE_SPOOL_MAX_SIZE: int = 64 * 1024 * 1024
+
+
+class AdaptiveChunker:
+    def __init__(self,
+                 initial_size: int = 20,
+                 min_size: int = 1,
+                 max_size: int = 500,
+                 target_seconds: float = 30.0,
+                 target_bytes: int = 50 * 1024 * 1024,
+                 smoothing: float = 0.5
+                 ):
+        self.size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.smoothing = smoothing
+        self.seconds_per_id: float = None
+        self.bytes_per_id: float = None
+
+    def _smooth(self, current: float, observed: float) -> float:
+        if current is None:
+            return observed
+        return self.smoothing * observed + (1 - self.smoothing) * current
+
+    def observe(self, ids_count: int, elapsed_seconds: float, payload_bytes: int) -> None:
+        self.seconds_per_id = self._smooth(self.seconds_per_id, elapsed_seconds / ids_count)
+        self.bytes_per_id = self._smooth(self.bytes_per_id, payload_bytes / ids_count)
+        by_latency: float = self.target_seconds / max(self.seconds_per_id, 1e-6)
+        by_payload: float = self.target_bytes / max(self.bytes_per_id, 1.0)
+        # do not let one noisy observation change the chunk size more than twice
+        new_size: int = int(min(by_latency, by_payload, self.size * 2))
+        self.size = max(self.min_size, min(self.max_size, max(new_size, self.size // 2)))
+
+    def take(self, ids: list[int]) -> tuple[list[int], list[int]]:
+        return ids[:self.size], ids[self.size:]
+
+
+def _bundle_path(member_name: str) -> str:
+    # drop the per-export root directory: <root>/charts/x.yaml -> charts/x.yaml
+    return member_name.split("/", 1)[1] if "/" in member_name else member_name
+
+
+def merge_export_bundles(bundles: Iterable[BinaryIO], output: BinaryIO = None, root_dir: str = None) -> BinaryIO:
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=BUNDLE_SPOOL_MAX_SIZE)
+    written_paths: set[str] = set()
+    written_uuids: set[str] = set()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as out_zip:
+        for bundle in bundles:
+            bundle.seek(0)
+            with zipfile.ZipFile(bundle, 'r') as in_zip:
+                for member in in_zip.infolist():
+                    if member.is_dir():
+                        continue
+                    root_dir = root_dir or member.filename.split("/", 1)[0]
+                    bundle_path: str = _bundle_path(member.filename)
+                    data: bytes = in_zip.read(member)
+                    uuid: str = None
+                    if "/" in bundle_path and bundle_path.endswith(".yaml"):
+                        uuid = (yaml_codec.load(data) or {}).get('uuid')
+                    # objects are deduped by uuid, paths repeat for same-named objects, e.g. tables of two schemas
+                    if uuid is None:
+                        if bundle_path in written_paths:
+                            continue
+                    elif uuid in written_uuids:
+                        continue
+                    else:
+                        written_uuids.add(uuid)
+                        if bundle_path in written_paths:
+                            # the import resolves objects by uuid, so the file name only has to be unique
+                            bundle_path = f"{bundle_path[:-len('.yaml')]}_{uuid}.yaml"
+                    out_zip.writestr(posixpath.join(root_dir, bundle_path), data)
+                    written_paths.add(bundle_path)
+    output.seek(0)
+    return output
@@ -1,9 +1,20 @@
 from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient.async_api_object import AsyncApiObject
 from SupersetApiClient.data_model import DataModel, default_string, json_field
 from dataclasses import dataclass, field
 
 
-@dataclass
+CHART_ADD_COLUMNS: tuple[str, ...] = (
+    "datasource_id",
+    "datasource_type",
+    "slice_name",
+    "params",
+    "viz_type",
+    "description",
+)
+
+
+@dataclass(slots=True)
 class Chart(DataModel):
     description: str = default_string()
     slice_name: str = field(metadata=dict(is_name_field=True), default="")
@@ -20,12 +31,12 @@ class Charts(ApiObject):
 
     @property
     def add_columns(self):
-        return [
-            "datasource_id",
-            "datasource_type",
-            "slice_name",
-            "params",
-            "viz_type",
-            "description",
-        ]
+        return list(CHART_ADD_COLUMNS)
+
+
+class AsyncCharts(AsyncApiObject):
+    object_type = "chart"
+    data_model = Chart
 
+    async def get_add_columns(self) -> list[str]:
+        return list(CHART_ADD_COLUMNS)
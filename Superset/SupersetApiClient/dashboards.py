@@ -1,10 +1,13 @@
 from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient.async_api_object import AsyncApiObject
 from SupersetApiClient.charts import Chart
 from SupersetApiClient.data_model import DataModel, default_string, json_field
 from dataclasses import dataclass, field
 
+UNTITLED_DASHBOARD_TITLE: str = '[ untitled dashboard ]'
 
-@dataclass
+
+@dataclass(slots=True)
 class Dashboard(DataModel):
     dashboard_title: str = field(metadata=dict(is_name_field=True))
     changed_on_utc: str
@@ -35,16 +38,14 @@ class Dashboard(DataModel):
         self.expanded_slices = expanded_slices
 
     def get_charts(self) -> list[Chart]:
-        charts: list[Chart] = []
-        for dash_chart in self.api_object.get_charts(self.id):
-            charts.append(self.api_object.client.charts.get(dash_chart['id']))
-        return charts
+        chart_ids: list[int] = [dash_chart['id'] for dash_chart in self.api_object.get_charts(self.id)]
+        return self.api_object.client.charts.get_many(chart_ids)
 
     def turn_chart_description(self):
         if self.json_metadata:
             expanded_slices: dict[str, bool] = {
                 dash_slice["id"]: True
-                for dash_slice in self.api_object.charts(self.id)
+                for dash_slice in self.api_object.get_charts(self.id)
             }
             if expanded_slices:
                 self.update_expanded_slices(expanded_slices)
@@ -68,9 +69,44 @@ class Dashboards(ApiObject):
             f"{self.api_endpoint}/{dash_id_or_slug}/charts"
         ).json()['result']
 
-    def get_untitled_dashboards(self) -> list[Dashboard]:
-        return self.find_by_name(name='[ untitled dashboard ]')
+    def get_untitled_dashboards(self, changed_before: str = None, columns: list[str] = None) -> list[Dashboard]:
+        filters: list[dict[str, any]] = [dict(col='changed_on', opr='lt', value=changed_before)] \
+            if changed_before else None
+        columns = self._projection(columns)
+        return [self.data_model.from_json(obj, self, columns)
+                for obj in self.list_all(filters=filters, columns=columns, dashboard_title=UNTITLED_DASHBOARD_TITLE)]
 
     def turn_chart_description(self) -> None:
         for dash in self.find_all():
             dash.turn_chart_description()
+
+
+class AsyncDashboards(AsyncApiObject):
+    object_type = "dashboard"
+    data_model = Dashboard
+
+    async def get_add_columns(self) -> list[str]:
+        return [*set(await super().get_add_columns() + ['is_managed_externally'])]
+
+    async def get_edit_columns(self) -> list[str]:
+        return [*set(await super().get_edit_columns() + ['is_managed_externally'])]
+
+    async def get_charts(self, dash_id_or_slug: str) -> list[dict[str, any]]:
+        response = await self.client.get(f"{self.api_endpoint}/{dash_id_or_slug}/charts")
+        return response.json()['result']
+
+    async def get_untitled_dashboards(self) -> list[Dashboard]:
+        return await self.find_by_name(name=UNTITLED_DASHBOARD_TITLE)
+
+    async def turn_chart_description(self) -> None:
+        async def turn_dashboard(dash: Dashboard) -> None:
+            if dash.json_metadata:
+                expanded_slices: dict[str, bool] = {
+                    dash_slice["id"]: True
+                    for dash_slice in await self.get_charts(dash.id)
+                }
+                if expanded_slices:
+                    dash.update_expanded_slices(expanded_slices)
+                    await self.save(dash)
+
+        await self.client.map_concurrent(turn_dashboard, await self.find_all())
@@ -3,6 +3,7 @@ import datetime
 import io
 import json
 import os
+from typing import BinaryIO
 from SupersetApiClient.exceptions import *
 
 
@@ -14,74 +15,106 @@ def default_string():
     return dataclasses.field(default="", repr=False)
 
 
-@dataclasses.dataclass
+class ModelCodec:
+    def __init__(self, model: type):
+        self.fields: tuple[dataclasses.Field, ...] = tuple(
+            f for f in dataclasses.fields(model) if not f.metadata.get('internal')
+        )
+        self.field_names: frozenset[str] = frozenset(f.name for f in self.fields)
+        self.json_field_names: tuple[str, ...] = tuple(f.name for f in self.fields if f.type is dict)
+        self.name_fields: tuple[str, ...] = tuple(f.name for f in self.fields if f.metadata.get('is_name_field'))
+        # (field name, json parent, json prop, is json-encoded) in field order
+        self.plan: tuple[tuple[str, str, str, bool], ...] = tuple(
+            (f.name, f.metadata.get("json_parent"), f.metadata.get("json_prop"), f.type is dict) for f in self.fields
+        )
+
+    @property
+    def name_field(self) -> str:
+        if not self.name_fields:
+            raise NameFieldNotFound()
+        if len(self.name_fields) > 1:
+            raise MultipleNameFieldFound()
+        return self.name_fields[0]
+
+    def decode(self, src_json: dict[str, any]) -> dict[str, any]:
+        res_dict: dict[str, any] = dict()
+        for name, json_parent, json_prop, _ in self.plan:
+            if json_parent in src_json:
+                el: any = src_json[json_parent][json_prop]
+            else:
+                el: any = src_json.get(name)
+            if el is not None:
+                res_dict[name] = el
+        return res_dict
+
+    def encode(self, obj, columns: list[str] = None) -> dict[str, any]:
+        res_json: dict[str, any] = {}
+        columns_set: set[str] = set(columns) if columns else None
+        for name, json_parent, json_prop, is_json in self.plan:
+            if columns_set is not None and name not in columns_set and json_parent not in columns_set:
+                continue
+            value: any = getattr(obj, name, _NOT_LOADED)
+            if value is _NOT_LOADED:
+                continue
+            if is_json:
+                value = json.dumps(value)
+            if json_parent:
+                res_json.setdefault(json_parent, {})[json_prop] = value
+            else:
+                res_json[name] = value
+        return res_json
+
+
+_NOT_LOADED: object = object()
+_CODECS: dict[type, ModelCodec] = {}
+
+
+@dataclasses.dataclass(slots=True)
 class DataModel:
     id: int
-    api_object = None
+    api_object: any = dataclasses.field(default=None, init=False, repr=False, compare=False,
+                                        metadata=dict(internal=True))
+
+    @classmethod
+    def codec(cls) -> ModelCodec:
+        codec: ModelCodec = _CODECS.get(cls)
+        if codec is None:
+            codec = _CODECS[cls] = ModelCodec(cls)
+        return codec
 
     @classmethod
     def fields(cls) -> tuple[dataclasses.Field]:
-        return dataclasses.fields(cls)
+        return cls.codec().fields
 
     @classmethod
     def name_field(cls) -> str:
-        res_l: list = [f.name for f in cls.fields() if f.metadata.get('is_name_field')]
-        if res_l:
-            if len(res_l) > 1:
-                raise MultipleNameFieldFound()
-            else:
-                return res_l[0]
-        else:
-            raise NameFieldNotFound()
+        return cls.codec().name_field
 
     def get_name(self) -> str:
         return getattr(self, self.name_field())
 
     @classmethod
-    def field_names(cls) -> set[str]:
-        return {f.name for f in cls.fields()}
+    def field_names(cls) -> frozenset[str]:
+        return cls.codec().field_names
 
     @classmethod
-    def json_field_names(cls) -> set[str]:
-        return {f.name for f in cls.fields() if f.type is dict}
+    def json_field_names(cls) -> tuple[str, ...]:
+        return cls.codec().json_field_names
 
     def __post_init__(self):
         for f in self.json_field_names():
             setattr(self, f, json.loads(getattr(self, f) or "{}"))
 
     @classmethod
-    def from_json(cls, src_json: dict, api_object):
-        res_dict: dict[str, any] = dict()
-        for f in cls.fields():
-            el: any = src_json.get(f.name)
-            if f.metadata.get("json_parent") in src_json:
-                el = src_json[f.metadata["json_parent"]][f.metadata["json_prop"]]
-            if el is not None:
-                res_dict[f.name] = el
-        cls.api_object = api_object
-        return cls(**res_dict)
+    def from_json(cls, src_json: dict, api_object, columns: list[str] = None, lazy: bool = False):
+        if columns:
+            return cls.partial_class().from_partial_json(src_json, api_object, lazy)
+        obj = cls(**cls.codec().decode(src_json))
+        obj.api_object = api_object
+        return obj
 
     def to_json(self, columns: list[str] = None) -> dict:
-        res_json = {}
-        iter_fields: tuple[dataclasses.Field]
-        if columns:
-            iter_fields = (f for f in self.fields()
-                           if f.name in columns or f.metadata.get("json_parent") in columns)
-        else:
-            iter_fields = self.fields()
-        for f in iter_fields:
-            if not hasattr(self, f.name):
-                continue
-            value = getattr(self, f.name)
-            if f.type is dict:
-                value = json.dumps(value)
-            if f.metadata.get("json_parent"):
-                meta_dict: dict[str, any] = res_json.get(f.metadata["json_parent"]) or {}
-                meta_dict.update({f.metadata["json_prop"]: value})
-                res_json[f.metadata["json_parent"]] = meta_dict
-            else:
-                res_json[f.name] = value
-        return res_json
+        return self.codec().encode(self, columns)
 
     @property
     def api_endpoint(self) -> str:
@@ -91,14 +124,21 @@ class DataModel:
         return f"{self.api_object.object_type}_{self.get_name()}" \
                f"{datetime.datetime.now().strftime('_%Y%m%dT%H%M%S') if add_ts else ''}"
 
-    def export_to_file(self, dir_path: str, filename: str = None) -> str:
-        return self.api_object.export_to_file(ids=[self.id], dir_path=dir_path, filename=filename or self.export_name())
+    def export_to_file(self, dir_path: str, filename: str = None, stream: bool = False) -> str:
+        return self.api_object.export_to_file(ids=[self.id], dir_path=dir_path,
+                                              filename=filename or self.export_name(), stream=stream)
+
+    def export_to_stream(self, writable: BinaryIO) -> str:
+        return self.api_object.export_to_stream(ids=[self.id], writable=writable)
 
     def export_to_buffer(self) -> io.BytesIO:
         return self.api_object.export_to_buffer(ids=[self.id])
 
     def update(self) -> '__class__':
         res = self.api_object.client.get(self.api_endpoint).json().get("result")
+        return self.update_from_json(res)
+
+    def update_from_json(self, res: dict[str, any]) -> '__class__':
         for f in self.fields():
             if f.name in res or f.metadata.get("json_parent") in res:
                 f_name: str = f.metadata.get("json_parent") or f.name
@@ -118,9 +158,48 @@ class DataModel:
     def delete(self) -> bool:
         return self.api_object.client.delete(self.api_endpoint).json().get("message") == "OK"
 
+    @classmethod
+    def partial_class(cls) -> type:
+        if cls not in _PARTIAL_CLASSES:
+            _PARTIAL_CLASSES[cls] = type(f"Partial{cls.__name__}", (PartialDataModel, cls), {})
+        return _PARTIAL_CLASSES[cls]
 
 
+_PARTIAL_CLASSES: dict[type, type] = {}
 
 
+# Model built from a list query with a columns projection: reading a field that was not fetched
+# raises FieldNotLoaded or, for lazy objects, loads the full object with update() first
+class PartialDataModel:
 
-
+    @classmethod
+    def from_partial_json(cls, src_json: dict, api_object, lazy: bool = False):
+        obj = cls.__new__(cls)
+        object.__setattr__(obj, '_loaded_fields', set())
+        object.__setattr__(obj, '_lazy', lazy)
+        obj.api_object = api_object
+        for f in cls.fields():
+            if f.metadata.get("json_parent") in src_json:
+                setattr(obj, f.name, src_json[f.metadata["json_parent"]].get(f.metadata["json_prop"]))
+            elif f.name in src_json:
+                el: any = src_json[f.name]
+                setattr(obj, f.name, json.loads(el or "{}") if f.type is dict else el)
+        return obj
+
+    def __getattribute__(self, name: str):
+        if name in type(self).field_names() and name not in object.__getattribute__(self, '_loaded_fields'):
+            if not object.__getattribute__(self, '_lazy'):
+                raise FieldNotLoaded(type(self).__name__, name)
+            self.update()
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name: str, value: any) -> None:
+        object.__setattr__(self, name, value)
+        if name in type(self).field_names():
+            object.__getattribute__(self, '_loaded_fields').add(name)
+
+    def __repr__(self) -> str:
+        loaded_fields: set[str] = object.__getattribute__(self, '_loaded_fields')
+        values: str = ", ".join(f"{f.name}={object.__getattribute__(self, f.name)!r}"
+                                for f in self.fields() if f.name in loaded_fields)
+        return f"{type(self).__name__}({values})"
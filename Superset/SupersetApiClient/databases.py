@@ -1,11 +1,12 @@
 from dataclasses import dataclass, field
 from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient.async_api_object import AsyncApiObject
 from SupersetApiClient.data_model import DataModel, json_field, default_string
 
 
-@dataclass
+@dataclass(slots=True)
 class Database(DataModel):
-    database_name: str
+    database_name: str = field(metadata=dict(is_name_field=True))
     allow_ctas: bool = field(default=False)
     allow_cvas: bool = field(default=False)
     allow_dml: bool = field(default=False)
@@ -24,3 +25,8 @@ class Database(DataModel):
 class Databases(ApiObject):
     object_type = "database"
     data_model = Database
+
+
+class AsyncDatabases(AsyncApiObject):
+    object_type = "database"
+    data_model = Database
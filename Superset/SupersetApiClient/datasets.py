@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
 from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient.async_api_object import AsyncApiObject
 from SupersetApiClient.data_model import DataModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Dataset(DataModel):
     database_id: int = field(metadata=dict(json_parent="database", json_prop="id"))
     database_name: str = field(metadata=dict(json_parent="database", json_prop="database_name"))
@@ -18,3 +19,8 @@ class Dataset(DataModel):
 class Datasets(ApiObject):
     object_type = "dataset"
     data_model = Dataset
+
+
+class AsyncDatasets(AsyncApiObject):
+    object_type = "dataset"
+    data_model = Dataset
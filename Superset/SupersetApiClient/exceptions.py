@@ -7,3 +7,13 @@ class MultipleNameFieldFound(Exception):
 class NameFieldNotFound(Exception):
     def __str__(self):
         return f'The model does not have a field with an is_name_field attribute in the metadata'
+
+
+class FieldNotLoaded(AttributeError):
+    def __init__(self, model_name: str, field_name: str):
+        super().__init__(field_name)
+        self.model_name = model_name
+        self.field_name = field_name
+
+    def __str__(self):
+        return f'Field {self.field_name} was not fetched for this partial {self.model_name} object'
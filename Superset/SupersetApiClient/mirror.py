@@ -0,0 +1,105 @@
+from __future__ import annotations
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+from typing import Iterator, Optional, TYPE_CHECKING
+from SupersetApiClient.data_model import DataModel
+
+if TYPE_CHECKING:
+    from SupersetApiClient.api_object import ApiObject
+
+
+class ObjectMirror:
+    CHANGED_ON_FIELDS: tuple[str, ...] = ('changed_on_utc', 'changed_on')
+
+    def __init__(self, api_object: ApiObject, db_path: str):
+        self.api_object = api_object
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_objects ("
+                " endpoint TEXT NOT NULL,"
+                " id INTEGER NOT NULL,"
+                " changed_on TEXT,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (endpoint, id))"
+            )
+
+    @property
+    def endpoint(self) -> str:
+        return self.api_object.api_endpoint
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn: sqlite3.Connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @classmethod
+    def _changed_on(cls, obj: dict[str, any]) -> Optional[str]:
+        return next((obj[f] for f in cls.CHANGED_ON_FIELDS if obj.get(f)), None)
+
+    def _last_changed_on(self, conn: sqlite3.Connection) -> Optional[tuple[str, str]]:
+        row: Optional[tuple[str, str]] = conn.execute(
+            "SELECT changed_on, payload FROM mirror_objects WHERE endpoint = ? AND changed_on IS NOT NULL"
+            " ORDER BY changed_on DESC LIMIT 1", (self.endpoint,)
+        ).fetchone()
+        if row is None:
+            return None
+        # the filter goes on the field the stored value was read from
+        obj: dict[str, any] = json.loads(row[1])
+        return next((f for f in self.CHANGED_ON_FIELDS if obj.get(f) == row[0]), self.CHANGED_ON_FIELDS[0]), row[0]
+
+    def _local_ids(self, conn: sqlite3.Connection) -> set[int]:
+        return {row[0] for row in conn.execute("SELECT id FROM mirror_objects WHERE endpoint = ?", (self.endpoint,))}
+
+    def sync(self, page_size: int = 100) -> list[DataModel]:
+        with self._lock, self._connect() as conn:
+            last_changed_on: Optional[tuple[str, str]] = self._last_changed_on(conn)
+            changed: list[dict[str, any]] = None
+            if last_changed_on:
+                changed_on_field, changed_on = last_changed_on
+                try:
+                    # objects changed within the same second as the last sync are fetched again, not missed
+                    changed = self.api_object.list_all(
+                        page_size, filters=[dict(col=changed_on_field, opr='gte', value=changed_on)]
+                    )
+                except Exception as e:
+                    logging.warning(f"Mirror {self.endpoint}: filter on {changed_on_field} rejected ({e}), "
+                                    f"listing all objects")
+            full_list: bool = changed is None
+            if full_list:
+                changed = self.api_object.list_all(page_size)
+            # pages shift while objects change, an object can be listed twice
+            changed_by_id: dict[int, dict[str, any]] = {obj['id']: obj for obj in changed}
+            conn.executemany(
+                "INSERT OR REPLACE INTO mirror_objects (endpoint, id, changed_on, payload) VALUES (?, ?, ?, ?)",
+                [(self.endpoint, obj_id, self._changed_on(obj), json.dumps(obj))
+                 for obj_id, obj in changed_by_id.items()]
+            )
+
+            if full_list:
+                remote_ids: set[int] = set(changed_by_id)
+            else:
+                remote_ids: set[int] = {obj['id'] for obj in self.api_object.list_all(page_size, columns=['id'])}
+            deleted_ids: set[int] = self._local_ids(conn) - remote_ids
+            conn.executemany(
+                "DELETE FROM mirror_objects WHERE endpoint = ? AND id = ?",
+                [(self.endpoint, obj_id) for obj_id in deleted_ids]
+            )
+            logging.info(f"Mirror {self.endpoint}: {len(changed_by_id)} changed, {len(deleted_ids)} deleted")
+
+            payloads: list[str] = [row[0] for row in conn.execute(
+                "SELECT payload FROM mirror_objects WHERE endpoint = ? ORDER BY id", (self.endpoint,)
+            )]
+        return [self.api_object.data_model.from_json(json.loads(payload), self.api_object) for payload in payloads]
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM mirror_objects WHERE endpoint = ?", (self.endpoint,))
@@ -1,17 +1,35 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
+from typing import Callable, Iterable
 from SupersetApiClient.charts import Charts
 from SupersetApiClient.dashboards import Dashboards
 from SupersetApiClient.databases import Databases
 from SupersetApiClient.datasets import Datasets
+from SupersetApiClient.auth import SupersetAuth
+from SupersetApiClient.token_cache import DEFAULT_TOKEN_CACHE_PATH, TokenCache
+from SupersetApiClient.transport import RetryingSession, RetryPolicy, TransportConfig
 
 
 class SupersetClient:
 
-    def __init__(self, api_endpoint: str, username: str, password: str):
+    def __init__(self,
+                 api_endpoint: str,
+                 username: str,
+                 password: str,
+                 max_workers: int = 8,
+                 transport: dict[str, any] = None,
+                 token_cache_path: str = DEFAULT_TOKEN_CACHE_PATH,
+                 mirror_path: str = None
+                 ):
         self.api_endpoint = api_endpoint
         self.username = username
         self.password = password
+        self.max_workers = max_workers
+        self.transport_config = TransportConfig(**(transport or {}))
+        self.retry_policy = RetryPolicy(self.transport_config)
+        self.token_cache = TokenCache(token_cache_path)
+        self.mirror_path = mirror_path
 
         self.dashboards = Dashboards(self)
         self.datasets = Datasets(self)
@@ -20,28 +38,10 @@ class SupersetClient:
 
     @cached_property
     def session(self) -> requests.sessions.Session:
-        api_session = requests.session()
-        jwt_token = api_session.post(
-            url=f"{self.api_endpoint}/security/login",
-            json={
-                "username": self.username,
-                "password": self.password,
-                "refresh": False,
-                "provider": "db"
-            }
-        ).json()["access_token"]
-
-        csrf_token = api_session.get(
-            url=f"{self.api_endpoint}/security/csrf_token/",
-            headers={'Authorization': f'Bearer {jwt_token}'}
-        ).json()["result"]
-
-        headers = {
-            'accept': 'application/json',
-            'Authorization': f'Bearer {jwt_token}',
-            'X-CSRFToken': csrf_token,
-        }
-        api_session.headers.update(headers)
+        api_session = RetryingSession(self.transport_config, self.retry_policy)
+        api_session.headers.update({'accept': 'application/json'})
+        api_session.auth = SupersetAuth(self.api_endpoint, self.username, self.password,
+                                        api_session, self.token_cache)
         return api_session
 
     @property
@@ -60,4 +60,10 @@ class SupersetClient:
     def delete(self):
         return self.session.delete
 
-
+    def map_concurrent(self, func: Callable, *iterables: Iterable) -> list:
+        if self.max_workers <= 1:
+            return list(map(func, *iterables))
+        # build the session before the workers share it, the first request logs in once under the auth lock
+        self.session
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, *iterables))
@@ -0,0 +1,60 @@
+import contextlib
+import json
+import os
+import threading
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+DEFAULT_TOKEN_CACHE_PATH: str = os.path.join(os.path.expanduser("~"), ".cache", "superset_deployer", "tokens.json")
+
+
+class TokenCache:
+    def __init__(self, path: str = DEFAULT_TOKEN_CACHE_PATH):
+        self.path = path
+        self._thread_lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(api_endpoint: str, username: str) -> str:
+        return f"{api_endpoint}|{username}"
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        with self._thread_lock:
+            lock_fd: int = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                os.close(lock_fd)
+
+    def _read_all(self) -> dict[str, dict[str, any]]:
+        try:
+            with open(self.path, 'r', encoding='UTF-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_all(self, entries: dict[str, dict[str, any]]) -> None:
+        tmp_path: str = f"{self.path}.{os.getpid()}.tmp"
+        fd: int = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='UTF-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self, key: str) -> Optional[dict[str, any]]:
+        return self._read_all().get(key)
+
+    def store(self, key: str, tokens: dict[str, any]) -> None:
+        # callers hold lock() so that read-modify-write is not interleaved with other processes
+        entries: dict[str, dict[str, any]] = self._read_all()
+        entries[key] = tokens
+        self._write_all(entries)
@@ -0,0 +1,123 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class TransportConfig:
+    pool_size: int = 32
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0
+    max_retries: int = 5
+    backoff_factor: float = 0.5
+    backoff_max: float = 60.0
+    retry_budget: int = 100
+    retry_budget_refill_per_minute: float = 60.0
+    retry_statuses: tuple[int, ...] = (429, 502, 503, 504)
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+
+class RetryBudget:
+    # token bucket: a burst of retries is allowed, afterwards retries are limited to the refill rate,
+    # so a flaky period early in a long run does not disable retries for the rest of it
+    def __init__(self, retries: int, refill_per_minute: float):
+        self.capacity = retries
+        self.refill_rate = refill_per_minute / 60
+        self.remaining: float = retries
+        self.updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def spend(self) -> bool:
+        with self._lock:
+            now: float = time.monotonic()
+            self.remaining = min(self.capacity, self.remaining + (now - self.updated) * self.refill_rate)
+            self.updated = now
+            if self.remaining < 1:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class RetryPolicy:
+    IDEMPOTENT_METHODS: frozenset[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT'})
+    # statuses that tell a request was not processed when they come with Retry-After
+    NOT_PROCESSED_STATUSES: tuple[int, ...] = (429, 503)
+
+    def __init__(self, config: TransportConfig):
+        self.config = config
+        self.budget = RetryBudget(config.retry_budget, config.retry_budget_refill_per_minute)
+
+    def is_idempotent(self, method: str) -> bool:
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def is_retryable_error(self, method: str, connect_error: bool) -> bool:
+        # a timed out or dropped import or delete may still complete on the server, only a failed connect is safe
+        return connect_error or self.is_idempotent(method)
+
+    def is_retryable_status(self, status_code: int, method: str = 'GET', retry_after: Optional[str] = None) -> bool:
+        if status_code not in self.config.retry_statuses:
+            return False
+        return self.is_idempotent(method) or (status_code in self.NOT_PROCESSED_STATUSES and retry_after is not None)
+
+    def should_retry(self, attempt: int) -> bool:
+        if attempt >= self.config.max_retries:
+            return False
+        if not self.budget.spend():
+            logging.warning("Retry budget is exhausted, giving up")
+            return False
+        return True
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.config.backoff_max)
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.config.backoff_max, self.config.backoff_factor * 2 ** attempt))
+
+
+class RetryingSession(requests.Session):
+    def __init__(self, config: TransportConfig, retry_policy: RetryPolicy):
+        super().__init__()
+        self.config = config
+        self.retry_policy = retry_policy
+        adapter = HTTPAdapter(pool_connections=config.pool_size, pool_maxsize=config.pool_size, max_retries=0)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    @staticmethod
+    def _rewind(kwargs: dict[str, any]) -> None:
+        for file_spec in (kwargs.get('files') or {}).values():
+            file_obj = file_spec[1] if isinstance(file_spec, tuple) else file_spec
+            if hasattr(file_obj, 'seek'):
+                file_obj.seek(0)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.config.timeout)
+        attempt: int = 0
+        while True:
+            self._rewind(kwargs)
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self.retry_policy.is_retryable_error(method, isinstance(e, requests.ConnectionError)) \
+                        or not self.retry_policy.should_retry(attempt):
+                    raise
+                delay: float = self.retry_policy.backoff(attempt)
+                logging.warning(f"{method} {url} failed ({e}), retry in {delay:.1f}s")
+            else:
+                if not self.retry_policy.is_retryable_status(response.status_code, method,
+                                                             response.headers.get('Retry-After')) \
+                        or not self.retry_policy.should_retry(attempt):
+                    return response
+                delay: float = self.retry_policy.backoff(attempt, response.headers.get('Retry-After'))
+                logging.warning(f"{method} {url} returned {response.status_code}, retry in {delay:.1f}s")
+                response.close()
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,22 @@
+import yaml
+from typing import IO, Optional, Union
+
+try:
+    from yaml import CSafeLoader as FastSafeLoader, CSafeDumper as FastSafeDumper
+except ImportError:
+    from yaml import SafeLoader as FastSafeLoader, SafeDumper as FastSafeDumper
+
+# libyaml folds long double-quoted scalars and escapes astral characters differently from
+# the pure-Python emitter, so files that end up in the deploy tree are always dumped with
+# the pure emitter to stay byte-for-byte identical on every machine
+StableSafeDumper = yaml.SafeDumper
+
+HAS_LIBYAML: bool = FastSafeLoader is not yaml.SafeLoader
+
+
+def load(stream: Union[str, bytes, IO]) -> any:
+    return yaml.load(stream, Loader=FastSafeLoader)
+
+
+def dump(data: any, stream: Optional[IO] = None, fast: bool = False, **kwargs) -> Union[str, bytes, None]:
+    return yaml.dump(data, stream, Dumper=FastSafeDumper if fast else StableSafeDumper, **kwargs)
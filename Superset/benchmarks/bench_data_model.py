@@ -0,0 +1,54 @@
+# Run from the Superset directory: python -m benchmarks.bench_data_model
+import json
+import time
+from SupersetApiClient.charts import Chart
+from SupersetApiClient.dashboards import Dashboard
+from SupersetApiClient.data_model import DataModel
+
+N_OBJECTS: int = 100_000
+
+CHART_PAYLOAD: dict[str, any] = dict(
+    id=1,
+    description="Chart description",
+    slice_name="Number of Members",
+    params=json.dumps({"viz_type": "big_number_total", "metric": "count", "adhoc_filters": [],
+                       "header_font_size": 0.4, "y_axis_format": "SMART_NUMBER"}),
+    datasource_id=12,
+    datasource_type="table",
+    viz_type="big_number_total",
+    dashboards=[1, 2],
+    cache_timeout=None,
+    changed_on_delta_humanized="2 days ago",
+)
+
+DASHBOARD_PAYLOAD: dict[str, any] = dict(
+    id=1,
+    dashboard_title="Slack Dashboard",
+    changed_on_utc="2023-01-10T10:00:00.000000+0000",
+    is_managed_externally=False,
+    published=True,
+    slug="slack_dashboard",
+    json_metadata=json.dumps({"color_scheme": "supersetColors", "expanded_slices": {},
+                              "label_colors": {f"label_{i}": "#1FA8C9" for i in range(20)}}),
+    position_json=json.dumps({f"CHART-{i}": {"type": "CHART", "meta": {"chartId": i, "width": 4, "height": 50}}
+                              for i in range(10)}),
+    changed_by_name="admin",
+    css="",
+    charts=["Number of Members", "Messages per Channel"],
+)
+
+
+def bench(model: type[DataModel], payload: dict[str, any]) -> None:
+    started: float = time.perf_counter()
+    objs: list[DataModel] = [model.from_json(payload, None) for _ in range(N_OBJECTS)]
+    decoded: float = time.perf_counter()
+    for obj in objs:
+        obj.to_json()
+    encoded: float = time.perf_counter()
+    print(f"{model.__name__:<10} from_json: {decoded - started:6.2f}s  to_json: {encoded - decoded:6.2f}s"
+          f"  ({N_OBJECTS} objects)")
+
+
+if __name__ == '__main__':
+    bench(Chart, CHART_PAYLOAD)
+    bench(Dashboard, DASHBOARD_PAYLOAD)
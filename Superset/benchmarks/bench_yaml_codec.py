@@ -0,0 +1,36 @@
+# Run from the Superset directory: python -m benchmarks.bench_yaml_codec [deploy_path]
+import os
+import sys
+import time
+import yaml
+from SupersetApiClient import yaml_codec
+
+
+def read_tree(deploy_path: str) -> list[bytes]:
+    docs: list[bytes] = []
+    for root, _, files in os.walk(deploy_path):
+        for f in sorted(files):
+            if f.endswith('.yaml'):
+                with open(os.path.join(root, f), 'rb') as yaml_file:
+                    docs.append(yaml_file.read())
+    return docs
+
+
+def timed(label: str, func, items: list) -> list:
+    started: float = time.perf_counter()
+    res: list = [func(item) for item in items]
+    print(f"{label:<28} {time.perf_counter() - started:6.3f}s")
+    return res
+
+
+if __name__ == '__main__':
+    docs: list[bytes] = read_tree(sys.argv[1] if len(sys.argv) > 1 else 'superset_objects')
+    print(f"{len(docs)} files, {sum(map(len, docs)) / 1024 / 1024:.1f} MiB, libyaml: {yaml_codec.HAS_LIBYAML}")
+    timed("yaml.safe_load", yaml.safe_load, docs)
+    objs: list = timed("yaml_codec.load", yaml_codec.load, docs)
+    timed("yaml.dump", lambda o: yaml.dump(o, allow_unicode=True, encoding='UTF-8'), objs)
+    stable: list[bytes] = timed("yaml_codec.dump",
+                                lambda o: yaml_codec.dump(o, allow_unicode=True, encoding='UTF-8'), objs)
+    timed("yaml_codec.dump(fast=True)",
+          lambda o: yaml_codec.dump(o, fast=True, allow_unicode=True, encoding='UTF-8'), objs)
+    print(f"yaml_codec.dump output identical to the tree: {sum(a == b for a, b in zip(docs, stable))}/{len(docs)}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules import each other relative to the Superset directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
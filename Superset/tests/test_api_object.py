@@ -0,0 +1,41 @@
+import json
+from SupersetApiClient.api_object import ApiObject
+
+MAX_PAGE_SIZE: int = 20
+
+
+class FakeResponse:
+    def __init__(self, body: dict[str, any]):
+        self.body = body
+
+    def json(self) -> dict[str, any]:
+        return self.body
+
+
+class FakeClient:
+    api_endpoint: str = "http://superset/api/v1"
+    max_workers: int = 4
+
+    def __init__(self, count: int):
+        self.objects: list[dict[str, any]] = [dict(id=i, uuid=f"uuid-{i}") for i in range(count)]
+
+    def get(self, url: str, params: dict[str, str] = None) -> FakeResponse:
+        q: dict[str, any] = json.loads(params['q'])
+        # the server silently caps the requested page size
+        page_size: int = min(q['page_size'], MAX_PAGE_SIZE)
+        start: int = q['page'] * page_size
+        return FakeResponse(dict(count=len(self.objects), result=self.objects[start:start + page_size]))
+
+    @staticmethod
+    def map_concurrent(func, *iterables) -> list:
+        return list(map(func, *iterables))
+
+
+def test_list_all_concurrent_follows_the_page_size_of_the_server():
+    api_obj = ApiObject(FakeClient(95))
+
+    objs: list[dict[str, any]] = api_obj.list_all(page_size=100)
+
+    assert [obj['id'] for obj in objs] == list(range(95))
+    # the first page fills the uuid cache as well
+    assert api_obj.uuid_ids['uuid-0'] == 0 and len(api_obj.uuid_ids) == 95
@@ -0,0 +1,102 @@
+import asyncio
+import base64
+import functools
+import json
+import threading
+import time
+import httpx
+from SupersetApiClient import async_superset_client
+from SupersetApiClient.async_superset_client import AsyncSupersetClient
+from SupersetApiClient.token_cache import TokenCache
+
+API_ENDPOINT: str = 'http://superset/api/v1'
+
+
+def jwt(subject: str, expires_in: float) -> str:
+    payload: bytes = json.dumps(dict(sub=subject, exp=time.time() + expires_in)).encode()
+    return f"header.{base64.urlsafe_b64encode(payload).decode().rstrip('=')}.signature"
+
+
+class FakeSuperset:
+    def __init__(self):
+        self.logins: int = 0
+        self.valid_token: str = None
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/security/login'):
+            self.logins += 1
+            self.valid_token = jwt(f"login-{self.logins}", 3600)
+            return httpx.Response(200, json=dict(access_token=self.valid_token, refresh_token=jwt('refresh', 7200)))
+        if request.url.path.endswith('/security/csrf_token/'):
+            return httpx.Response(200, json=dict(result='csrf'))
+        if request.headers.get('Authorization') != f"Bearer {self.valid_token}":
+            return httpx.Response(401, json=dict(msg='Token has expired'))
+        return httpx.Response(200, json=dict(result=dict(id=1)))
+
+
+def run_client(fake: FakeSuperset, token_cache_path: str, monkeypatch) -> httpx.Response:
+    monkeypatch.setattr(async_superset_client.httpx, 'AsyncClient',
+                        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(fake.handle)))
+
+    async def get() -> httpx.Response:
+        async with AsyncSupersetClient(API_ENDPOINT, 'admin', 'admin', token_cache_path=token_cache_path) as client:
+            return await client.get(f"{API_ENDPOINT}/dashboard/1")
+
+    return asyncio.run(get())
+
+
+def test_async_client_shares_cached_tokens(tmp_path, monkeypatch):
+    fake = FakeSuperset()
+    token_cache_path: str = str(tmp_path / 'tokens.json')
+
+    assert run_client(fake, token_cache_path, monkeypatch).status_code == 200
+    assert run_client(fake, token_cache_path, monkeypatch).status_code == 200
+    assert fake.logins == 1
+
+
+def test_async_client_logs_in_again_on_401(tmp_path, monkeypatch):
+    fake = FakeSuperset()
+    token_cache_path: str = str(tmp_path / 'tokens.json')
+    run_client(fake, token_cache_path, monkeypatch)
+    # the server revoked the cached token
+    fake.valid_token = None
+
+    assert run_client(fake, token_cache_path, monkeypatch).status_code == 200
+    assert fake.logins == 2
+
+
+def test_async_client_waits_for_the_cache_lock_off_the_event_loop(tmp_path, monkeypatch):
+    fake = FakeSuperset()
+    token_cache_path: str = str(tmp_path / 'tokens.json')
+    released: threading.Event = threading.Event()
+    locked: threading.Event = threading.Event()
+    ticked_while_locked: list[bool] = []
+
+    def hold_lock() -> None:
+        # another process refreshes the tokens meanwhile
+        with TokenCache(token_cache_path).lock():
+            locked.set()
+            ticked_while_locked.append(released.wait(2))
+
+    holder: threading.Thread = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(5)
+    ticks: list[int] = []
+
+    async def tick() -> None:
+        while not released.is_set():
+            ticks.append(1)
+            if len(ticks) == 5:
+                released.set()
+            await asyncio.sleep(0.01)
+
+    async def main() -> httpx.Response:
+        async with AsyncSupersetClient(API_ENDPOINT, 'admin', 'admin', token_cache_path=token_cache_path) as client:
+            response, _ = await asyncio.gather(client.get(f"{API_ENDPOINT}/dashboard/1"), tick())
+            return response
+
+    monkeypatch.setattr(async_superset_client.httpx, 'AsyncClient',
+                        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(fake.handle)))
+    assert asyncio.run(main()).status_code == 200
+    holder.join()
+    assert ticked_while_locked == [True]
@@ -0,0 +1,55 @@
+import io
+import zipfile
+import pytest
+import yaml
+from SupersetApiClient.api_object import ApiObject
+from SupersetApiClient.bundle import AdaptiveChunker, merge_export_bundles
+
+
+def export_zip(members: dict[str, dict[str, any]]) -> io.BytesIO:
+    buffer: io.BytesIO = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_file:
+        zip_file.writestr("export/metadata.yaml", yaml.dump(dict(version='1.0.0')))
+        for path, obj_yaml in members.items():
+            zip_file.writestr(f"export/{path}", yaml.dump(obj_yaml))
+    return buffer
+
+
+def test_merge_keeps_same_named_objects_with_distinct_uuids():
+    merged = merge_export_bundles([
+        export_zip({'datasets/examples/sales.yaml': dict(uuid='ds-public'),
+                    'charts/Revenue.yaml': dict(uuid='chart-1')}),
+        export_zip({'datasets/examples/sales.yaml': dict(uuid='ds-archive'),
+                    'charts/Revenue.yaml': dict(uuid='chart-1')}),
+    ])
+
+    with zipfile.ZipFile(merged) as merged_zip:
+        uuids: list[str] = [yaml.safe_load(merged_zip.read(name)).get('uuid') for name in merged_zip.namelist()]
+        assert merged_zip.namelist().count("export/metadata.yaml") == 1
+    assert sorted(uuid for uuid in uuids if uuid) == ['chart-1', 'ds-archive', 'ds-public']
+
+
+class FakeClient:
+    max_workers: int = 4
+
+    @staticmethod
+    def map_concurrent(func, *iterables) -> list:
+        return list(map(func, *iterables))
+
+
+def test_export_bulk_closes_fetched_chunks_when_a_chunk_fails(monkeypatch):
+    api_obj = ApiObject(FakeClient())
+    exported: list[io.BytesIO] = []
+
+    def export_to_spooled_file(ids: list[int]) -> io.BytesIO:
+        if ids[0] == 3:
+            raise Exception("export failed")
+        exported.append(export_zip({}))
+        return exported[-1]
+
+    monkeypatch.setattr(api_obj, 'export_to_spooled_file', export_to_spooled_file)
+    with pytest.raises(Exception):
+        # the three chunks are fetched in one wave
+        api_obj.export_bulk([1, 2, 3], chunker=AdaptiveChunker(initial_size=1))
+
+    assert len(exported) == 2 and all(bundle.closed for bundle in exported)
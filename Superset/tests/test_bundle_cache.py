@@ -0,0 +1,28 @@
+import os
+from Deployer.bundle_cache import BundleCache
+
+
+class ListedEntries(list):
+    def __enter__(self):
+        return iter(self)
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_evict_skips_files_removed_by_another_worker(tmp_path, monkeypatch):
+    cache = BundleCache(str(tmp_path), max_size=10)
+    cache.put('a', b'12345')
+    cache.put('b', b'12345')
+    real_scandir = os.scandir
+
+    def scandir(path: str) -> ListedEntries:
+        entries: ListedEntries = ListedEntries(real_scandir(path))
+        # a concurrent eviction removes a file after it was listed
+        os.remove(cache._path('b'))
+        return entries
+
+    monkeypatch.setattr(os, 'scandir', scandir)
+    cache.put('c', b'12345')
+
+    assert sorted(os.listdir(tmp_path)) == ['a.zip', 'c.zip']
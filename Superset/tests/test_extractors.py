@@ -0,0 +1,180 @@
+import contextlib
+import io
+import os
+import zipfile
+import yaml
+from Deployer.catalogue import DeployCatalogue
+from Deployer.extractors import SupersetObjectExtractor
+from Deployer.importers import SupersetObjectImporter
+from Deployer.uuid_registry import UuidRegistry
+from SupersetApiClient.dashboards import Dashboard
+
+DATABASE: dict[str, any] = dict(database_name='examples', uuid='db-1')
+DATASET: dict[str, any] = dict(table_name='sales', uuid='ds-1', database_uuid='db-1')
+
+
+def chart(uuid: str, slice_name: str) -> dict[str, any]:
+    return dict(slice_name=slice_name, uuid=uuid, dataset_uuid='ds-1')
+
+
+def dashboard(uuid: str, title: str, *charts: dict[str, any]) -> dict[str, any]:
+    return dict(dashboard_title=title, uuid=uuid, slug=None,
+                position={f"CHART-{c['uuid']}": dict(meta=dict(uuid=c['uuid'])) for c in charts})
+
+
+class FakeDashboards:
+    data_model = Dashboard
+
+    def __init__(self, dashboards: dict[int, tuple[dict[str, any], list[dict[str, any]]]]):
+        self.dashboards = dashboards
+        self.exported_ids: list[list[int]] = []
+        # changed_on of the dependencies by uuid, v1 unless a test edits one
+        self.changed_on: dict[str, str] = {}
+
+    def list_all(self, columns: list[str] = None, **kwargs) -> list[dict[str, any]]:
+        return [dict(id=obj_id, dashboard_title=dash['dashboard_title'], changed_on_utc=f"2024-01-0{obj_id}")
+                for obj_id, (dash, _) in self.dashboards.items()
+                if dash['dashboard_title'] == kwargs.get('dashboard_title', dash['dashboard_title'])]
+
+    @contextlib.contextmanager
+    def export_bulk(self, ids: list[int]):
+        self.exported_ids.append(sorted(ids))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as obj_zip:
+            obj_zip.writestr('export/databases/examples.yaml', yaml.dump(DATABASE))
+            obj_zip.writestr('export/datasets/examples/sales.yaml', yaml.dump(DATASET))
+            for obj_id in ids:
+                dash, charts = self.dashboards[obj_id]
+                obj_zip.writestr(f"export/dashboards/{dash['dashboard_title']}_{obj_id}.yaml", yaml.dump(dash))
+                for c in charts:
+                    obj_zip.writestr(f"export/charts/{c['slice_name']}_{c['uuid']}.yaml", yaml.dump(c))
+        buffer.seek(0)
+        yield buffer
+
+
+class FakeDependencies:
+    def __init__(self, dashboards: FakeDashboards, objects: list[dict[str, any]]):
+        self.dashboards = dashboards
+        self.objects = objects
+
+    def list_all(self, columns: list[str] = None, **kwargs) -> list[dict[str, any]]:
+        return [dict(id=i, uuid=obj['uuid'], changed_on_utc=self.dashboards.changed_on.get(obj['uuid'], 'v1'))
+                for i, obj in enumerate(self.objects)]
+
+
+class FakeApiClient:
+    def __init__(self, dashboards: FakeDashboards):
+        self.dashboards = dashboards
+        self.charts = FakeDependencies(dashboards, [c for _, charts in dashboards.dashboards.values() for c in charts])
+        self.datasets = FakeDependencies(dashboards, [DATASET])
+        self.databases = FakeDependencies(dashboards, [DATABASE])
+
+
+class FakeDeployer:
+    def __init__(self, tmp_path, dashboards: FakeDashboards):
+        self.env: str = 'test'
+        self.config: dict[str, any] = dict(deploy_path=str(tmp_path / 'superset_objects'), extract_workers=1)
+        os.mkdir(self.config['deploy_path'])
+        self.api_client = FakeApiClient(dashboards)
+        self.uuid_registry = UuidRegistry(str(tmp_path / 'test.uuid_registry.sqlite'))
+        self.catalogue = DeployCatalogue(self.config['deploy_path'], dict(
+            databases='database_name', datasets='table_name', charts='slice_name', dashboards='dashboard_title'
+        ))
+        self.extractor = SupersetObjectExtractor(self)
+
+    @staticmethod
+    def get_deploy_object_name(src_object_name: str) -> str:
+        return src_object_name.replace(' ', '_')
+
+    def object_path(self, object_class: str) -> str:
+        return os.path.join(self.config['deploy_path'], object_class)
+
+
+def load(deployer: FakeDeployer, object_class: str, deploy_name: str) -> dict[str, any]:
+    with open(os.path.join(deployer.object_path(object_class), f"{deploy_name}.yaml"), encoding='UTF-8') as f:
+        return yaml.safe_load(f)
+
+
+def test_extract_all_keeps_latest_of_same_titled_dashboards(tmp_path):
+    dashboards = FakeDashboards({
+        1: (dashboard('dash-1', 'Sales', chart('chart-1', 'Revenue')), [chart('chart-1', 'Revenue')]),
+        2: (dashboard('dash-2', 'Sales', chart('chart-2', 'Revenue')), [chart('chart-2', 'Revenue')]),
+    })
+    deployer = FakeDeployer(tmp_path, dashboards)
+    deployer.extractor.extract_all('dashboards')
+
+    assert dashboards.exported_ids == [[2]]
+    assert load(deployer, 'dashboards', 'Sales')['uuid'] == 'dash-2'
+    assert deployer.uuid_registry.uuid_for('dashboards', 'Sales') == 'dash-2'
+    assert deployer.uuid_registry.uuid_for('charts', 'Revenue') == 'chart-2'
+
+
+def test_extract_all_keeps_charts_sharing_a_name(tmp_path):
+    dashboards = FakeDashboards({
+        1: (dashboard('dash-1', 'Sales', chart('chart-1', 'Revenue')), [chart('chart-1', 'Revenue')]),
+        2: (dashboard('dash-2', 'Marketing', chart('chart-2', 'Revenue')), [chart('chart-2', 'Revenue')]),
+    })
+    deployer = FakeDeployer(tmp_path, dashboards)
+    deployer.extractor.extract_all('dashboards')
+
+    assert load(deployer, 'charts', 'Revenue')['uuid'] == 'chart-1'
+    assert load(deployer, 'charts', 'Revenue_chart-2')['uuid'] == 'chart-2'
+    assert dict(deployer.uuid_registry.load_uuid_map()['charts']) == {
+        'chart-1': 'Revenue', 'chart-2': 'Revenue_chart-2'
+    }
+    # every dashboard keeps pointing to its own chart
+    for dash_name, chart_uuid, chart_name in (('Sales', 'chart-1', 'Revenue'),
+                                              ('Marketing', 'chart-2', 'Revenue_chart-2')):
+        position: dict[str, any] = load(deployer, 'dashboards', dash_name)['position']
+        assert position[f"CHART-{chart_uuid}"]['meta']['_deploy_chart_name'] == chart_name
+
+
+def test_extract_all_exports_dashboards_whose_dependencies_changed(tmp_path):
+    dashboards = FakeDashboards({
+        1: (dashboard('dash-1', 'Sales', chart('chart-1', 'Revenue')), [chart('chart-1', 'Revenue')]),
+        2: (dashboard('dash-2', 'Marketing', chart('chart-2', 'Leads')), [chart('chart-2', 'Leads')]),
+    })
+    deployer = FakeDeployer(tmp_path, dashboards)
+    deployer.extractor.extract_all('dashboards')
+    deployer.extractor.extract_all('dashboards')
+    assert dashboards.exported_ids == [[1, 2]]
+
+    # a chart edited on the server
+    dashboards.changed_on['chart-2'] = 'v2'
+    deployer.extractor.extract_all('dashboards')
+    # a database edited on the server is a dependency of both dashboards
+    dashboards.changed_on['db-1'] = 'v2'
+    deployer.extractor.extract_all('dashboards')
+    assert dashboards.exported_ids == [[1, 2], [2], [1, 2]]
+
+
+def test_extract_all_restores_locally_edited_files(tmp_path):
+    dashboards = FakeDashboards({
+        1: (dashboard('dash-1', 'Sales', chart('chart-1', 'Revenue')), [chart('chart-1', 'Revenue')]),
+    })
+    deployer = FakeDeployer(tmp_path, dashboards)
+    deployer.extractor.extract_all('dashboards')
+    chart_path: str = os.path.join(deployer.object_path('charts'), 'Revenue.yaml')
+    with open(chart_path, 'a', encoding='UTF-8') as f:
+        f.write('local_edit: 1\n')
+
+    deployer.extractor.extract_all('dashboards')
+
+    assert dashboards.exported_ids == [[1], [1]]
+    assert 'local_edit' not in load(deployer, 'charts', 'Revenue')
+
+
+def test_load_uuid_map_of_dashboards_sharing_a_deploy_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dashboards = FakeDashboards({
+        1: (dashboard('dash-1', 'Sales report', chart('chart-1', 'Revenue')), [chart('chart-1', 'Revenue')]),
+        2: (dashboard('dash-2', 'Sales_report', chart('chart-2', 'Revenue')), [chart('chart-2', 'Revenue')]),
+        3: (dashboard('dash-3', 'Marketing', chart('chart-3', 'Revenue')), [chart('chart-3', 'Revenue')]),
+    })
+    deployer = FakeDeployer(tmp_path, dashboards)
+    uuid_map = SupersetObjectImporter(deployer).load_uuid_map(['Sales report', 'Sales_report', 'Marketing'],
+                                                              'dashboards')
+
+    assert dashboards.exported_ids == [[2, 3]]
+    assert dict(uuid_map['dashboards']) == {'dash-2': 'Sales_report', 'dash-3': 'Marketing'}
+    assert dict(uuid_map['charts']) == {'chart-2': 'Revenue', 'chart-3': 'Revenue_chart-3'}
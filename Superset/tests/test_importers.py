@@ -0,0 +1,59 @@
+from bidict import bidict
+from Deployer.importers import SupersetObjectImporter
+from Deployer.uuid_registry import OBJECT_CLASSES
+from test_planner import FakeDeployer, write_tree
+
+
+class FakeObjects:
+    def __init__(self, name_field: str, objects: list[dict[str, any]]):
+        self.data_model = type('FakeModel', (), dict(name_field=staticmethod(lambda: name_field)))
+        self.objects = objects
+
+    def list_by_uuid(self, uuids: list[str], columns: list[str] = None) -> list[dict[str, any]]:
+        return [obj for obj in self.objects if obj['uuid'] in uuids]
+
+    def list_all(self, columns: list[str] = None, **kwargs) -> list[dict[str, any]]:
+        return [obj for obj in self.objects if all(obj.get(k) == v for k, v in kwargs.items())]
+
+
+def test_load_uuid_map_rebuilds_stale_dependency_uuids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    deployer = FakeDeployer(tmp_path)
+    deployer.env = 'test'
+    write_tree(deployer, ['sales_0'])
+    deployer.api_client.dashboards = FakeObjects('dashboard_title', [
+        dict(id=1, dashboard_title='sales_0', uuid='dash-sales_0')
+    ])
+    # the chart was recreated on the server, the database was deleted
+    deployer.api_client.charts = FakeObjects('slice_name', [dict(id=2, slice_name='sales_0', uuid='chart-new')])
+    deployer.api_client.datasets = FakeObjects('table_name', [dict(id=3, table_name='sales', uuid='ds-server')])
+    deployer.api_client.databases = FakeObjects('database_name', [])
+    deployer.uuid_registry.update({
+        'dashboards': {'dash-sales_0': 'sales_0'},
+        'charts': {'chart-old': 'sales_0'},
+        'datasets': {'ds-server': 'sales'},
+        'databases': {'db-old': 'examples'},
+    })
+
+    uuid_map: dict[str, bidict] = SupersetObjectImporter(deployer).load_uuid_map(['sales_0'], 'dashboards')
+
+    assert dict(uuid_map['charts']) == {'chart-new': 'sales_0'}
+    assert dict(uuid_map['datasets']) == {'ds-server': 'sales'}
+    assert dict(uuid_map['databases']) == {}
+
+
+def test_import_bundle_caches_the_ids_of_imported_objects(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    deployer = FakeDeployer(tmp_path)
+    deployer.env = 'test'
+    write_tree(deployer, [])
+    databases = FakeObjects('database_name', [dict(id=7, database_name='examples', uuid='db-1')])
+    databases.import_from_buffer = lambda buffer, overwrite, passwords: None
+    deployer.api_client.databases = databases
+    uuid_map: dict[str, bidict] = {object_class: bidict() for object_class in OBJECT_CLASSES}
+    listed: list[list[str]] = []
+    monkeypatch.setattr(databases, 'list_by_uuid', lambda uuids, columns=None: listed.append(uuids) or [])
+
+    SupersetObjectImporter(deployer).import_bundle(['examples'], 'databases', uuid_map)
+
+    assert listed == [['db-1']]
@@ -0,0 +1,55 @@
+from SupersetApiClient.mirror import ObjectMirror
+
+
+class FakeModel:
+    @staticmethod
+    def from_json(obj: dict[str, any], api_object) -> dict[str, any]:
+        return obj
+
+
+class FakeApiObject:
+    api_endpoint: str = "http://superset/api/v1/chart"
+    data_model = FakeModel
+
+    def __init__(self, objects: list[dict[str, any]], reject_filters: bool = False):
+        self.objects = objects
+        self.reject_filters = reject_filters
+        self.filters: list[list[dict[str, any]]] = []
+
+    def list_all(self, page_size: int = 100, filters: list[dict[str, any]] = None, columns: list[str] = None):
+        self.filters.append(filters)
+        if not filters:
+            return list(self.objects)
+        if self.reject_filters:
+            raise KeyError('result')
+        (changed_filter,) = filters
+        # the listing repeats an object whose page shifted
+        changed: list[dict[str, any]] = [obj for obj in self.objects
+                                         if obj[changed_filter['col']] >= changed_filter['value']]
+        return changed + changed[-1:]
+
+
+def test_sync_filters_on_the_stored_field_including_the_last_change(tmp_path):
+    api_obj = FakeApiObject([dict(id=1, changed_on_utc='2026-01-01T00:00:00'),
+                             dict(id=2, changed_on_utc='2026-01-02T00:00:00')])
+    mirror = ObjectMirror(api_obj, str(tmp_path / 'mirror.sqlite'))
+    mirror.sync()
+    # a change within the same second as the last sync
+    api_obj.objects[0] = dict(id=1, changed_on_utc='2026-01-02T00:00:00', name='changed')
+
+    objs: list[dict[str, any]] = mirror.sync()
+
+    assert api_obj.filters[1] == [dict(col='changed_on_utc', opr='gte', value='2026-01-02T00:00:00')]
+    assert [obj['id'] for obj in objs] == [1, 2] and objs[0]['name'] == 'changed'
+
+
+def test_sync_lists_all_objects_when_the_filter_is_rejected(tmp_path):
+    api_obj = FakeApiObject([dict(id=1, changed_on_utc='2026-01-01T00:00:00'),
+                             dict(id=2, changed_on_utc='2026-01-02T00:00:00')], reject_filters=True)
+    mirror = ObjectMirror(api_obj, str(tmp_path / 'mirror.sqlite'))
+    mirror.sync()
+    del api_obj.objects[1]
+
+    objs: list[dict[str, any]] = mirror.sync()
+
+    assert [obj['id'] for obj in objs] == [1]
@@ -0,0 +1,125 @@
+import os
+import yaml
+from bidict import bidict
+from Deployer.catalogue import DeployCatalogue
+from Deployer.planner import CHANGE_NONE, CHANGE_REMOTE, DeploymentPlanner
+from Deployer.uuid_registry import OBJECT_CLASSES, UuidRegistry
+
+NAME_FIELDS: dict[str, str] = dict(databases='database_name', datasets='table_name', charts='slice_name',
+                                   dashboards='dashboard_title')
+
+
+def write(deploy_path: str, object_class: str, deploy_name: str, obj_yaml: dict[str, any]) -> None:
+    os.makedirs(os.path.join(deploy_path, object_class), exist_ok=True)
+    with open(os.path.join(deploy_path, object_class, f"{deploy_name}.yaml"), 'w', encoding='UTF-8') as f:
+        yaml.dump(obj_yaml, f)
+
+
+def write_dashboard(deploy_path: str, name: str, dataset: str) -> None:
+    write(deploy_path, 'charts', name, dict(slice_name=name, uuid=f"chart-{name}", _deploy_dataset_name=dataset))
+    write(deploy_path, 'dashboards', name, dict(
+        dashboard_title=name, uuid=f"dash-{name}",
+        position={f"CHART-{name}": dict(meta=dict(uuid=f"chart-{name}", _deploy_chart_name=name))}
+    ))
+
+
+class FakeListing:
+    def __init__(self):
+        self.listed_uuids: list[list[str]] = []
+        self.changed_on: dict[str, str] = {}
+
+    def list_by_uuid(self, uuids: list[str], columns: list[str] = None) -> list[dict[str, any]]:
+        self.listed_uuids.append(sorted(uuids))
+        return [dict(id=i, uuid=uuid, changed_on_utc=self.changed_on.get(uuid, f"changed-{uuid}"))
+                for i, uuid in enumerate(uuids)]
+
+
+class FakeImporter:
+    def import_bundle(self, object_names: list[str], object_class: str, uuid_map, build_order=None,
+                      rate_limiter=None, skip_classes: tuple[str, ...] = ()) -> float:
+        return 0.0
+
+    def remote_objects(self, api_obj, object_names: list[str], columns: list[str]) -> dict[str, dict[str, any]]:
+        return {}
+
+    def load_uuid_map(self, object_names: list[str], object_class: str, remote=None) -> dict[str, bidict]:
+        return {object_class: bidict() for object_class in OBJECT_CLASSES}
+
+
+class FakeDeployer:
+    def __init__(self, tmp_path, **config):
+        deploy_path: str = str(tmp_path / 'superset_objects')
+        self.config: dict[str, any] = dict(deploy_path=deploy_path, **config)
+        self.catalogue = DeployCatalogue(deploy_path, NAME_FIELDS)
+        self.api_client = type('FakeApiClient', (), {object_class: FakeListing() for object_class in OBJECT_CLASSES})()
+        self.importer = FakeImporter()
+        self.uuid_registry = UuidRegistry(str(tmp_path / 'test.uuid_registry.sqlite'))
+
+    @staticmethod
+    def get_deploy_object_name(src_object_name: str) -> str:
+        return src_object_name
+
+    def object_path(self, object_class: str) -> str:
+        return os.path.join(self.config['deploy_path'], object_class)
+
+
+def write_tree(deployer: FakeDeployer, shared: list[str]) -> None:
+    deploy_path: str = deployer.config['deploy_path']
+    write(deploy_path, 'databases', 'examples', dict(database_name='examples', uuid='db-1'))
+    for dataset in ('sales', 'users'):
+        write(deploy_path, 'datasets', dataset, dict(table_name=dataset, uuid=f"ds-{dataset}",
+                                                     _deploy_database_name='examples'))
+    for name in shared:
+        write_dashboard(deploy_path, name, 'sales')
+    write_dashboard(deploy_path, 'users_0', 'users')
+
+
+def test_plan_splits_components_larger_than_the_batch(tmp_path):
+    deployer = FakeDeployer(tmp_path, import_batch_size=2, deploy_workers=4)
+    shared: list[str] = [f"sales_{i}" for i in range(5)]
+    write_tree(deployer, shared)
+    plan = DeploymentPlanner(deployer).plan([*shared, 'users_0'])
+
+    assert all(len(bundle.object_names) <= 2 for unit in plan.units for bundle in unit.bundles)
+    assert sorted(name for unit in plan.units for name in unit.object_names) == sorted([*shared, 'users_0'])
+    # dashboards sharing a dataset are never imported by concurrent units
+    shared_units = [unit for unit in plan.units if set(unit.object_names) & set(shared)]
+    assert len(shared_units) == 1
+    assert plan.shared == [('databases', 'examples')]
+    assert [len(bundle.object_names) for bundle in shared_units[0].bundles] == [2, 2, 1]
+    for bundle in shared_units[0].bundles:
+        assert {node for node in bundle.build_order if node[0] == 'dashboards'} == \
+               {('dashboards', name) for name in bundle.object_names}
+        assert bundle.build_order[0] == ('databases', 'examples')
+
+
+def test_deploy_bundle_fetches_only_its_objects(tmp_path):
+    deployer = FakeDeployer(tmp_path, import_batch_size=2, deploy_workers=1)
+    write_tree(deployer, ['sales_0', 'sales_1'])
+    planner = DeploymentPlanner(deployer)
+    plan = planner.plan(['sales_0', 'sales_1', 'users_0'])
+    deployer.api_client.dashboards.listed_uuids.clear()
+    planner.deploy_unit(plan, plan.units[0])
+
+    assert deployer.api_client.dashboards.listed_uuids == [['dash-sales_0', 'dash-sales_1']]
+    states: dict[str, tuple[str, str]] = deployer.uuid_registry.import_states('dashboards')
+    assert states['sales_0'][0] == plan.tree_hashes['sales_0']
+    assert 'users_0' not in states
+
+
+def test_plan_detects_server_changes_of_dependencies(tmp_path):
+    deployer = FakeDeployer(tmp_path)
+    write_tree(deployer, ['sales_0'])
+    deployer.importer.remote_objects = lambda api_obj, object_names, columns: {
+        object_name: dict(id=1, uuid=f"dash-{object_name}") for object_name in object_names
+    }
+    planner = DeploymentPlanner(deployer)
+    plan = planner.plan(['sales_0', 'users_0'])
+    for unit in plan.units:
+        planner.deploy_unit(plan, unit)
+    assert set(planner.plan(['sales_0', 'users_0']).changes.values()) == {CHANGE_NONE}
+
+    # the dataset of sales_0 is edited on the server
+    deployer.api_client.datasets.changed_on['ds-sales'] = 'edited'
+
+    assert planner.plan(['sales_0', 'users_0']).changes == dict(sales_0=CHANGE_REMOTE, users_0=CHANGE_NONE)
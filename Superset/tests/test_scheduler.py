@@ -0,0 +1,48 @@
+import pytest
+from Deployer.planner import DeploymentBundle, DeploymentPlan, DeploymentUnit
+from Deployer.scheduler import DeploymentScheduler
+
+
+class FakePlanner:
+    def __init__(self, fail_shared: bool = False):
+        self.fail_shared = fail_shared
+        self.calls: list[str] = []
+
+    def deploy_shared(self, plan: DeploymentPlan, rate_limiter=None) -> float:
+        self.calls.append('shared')
+        if self.fail_shared:
+            raise Exception("database import failed")
+        return 0.0
+
+    def deploy_unit(self, plan: DeploymentPlan, unit: DeploymentUnit, rate_limiter=None) -> float:
+        self.calls.extend(unit.object_names)
+        return 0.0
+
+
+class FakeDeployer:
+    def __init__(self, planner: FakePlanner):
+        self.config: dict[str, any] = dict(deploy_workers=4)
+        self.planner = planner
+
+
+def plan_with_shared_database() -> DeploymentPlan:
+    plan = DeploymentPlan('dashboards', ['a', 'b', 'c'], {}, [])
+    plan.units = [DeploymentUnit([DeploymentBundle([name], [])]) for name in plan.object_names]
+    plan.shared = [('databases', 'examples')]
+    return plan
+
+
+def test_shared_objects_are_deployed_before_the_units():
+    planner = FakePlanner()
+    timings = DeploymentScheduler(FakeDeployer(planner)).run(plan_with_shared_database())
+
+    assert planner.calls[0] == 'shared'
+    assert sorted(planner.calls[1:]) == ['a', 'b', 'c']
+    assert [timing.object_class for timing in timings] == ['databases', 'dashboards', 'dashboards', 'dashboards']
+
+
+def test_units_are_not_deployed_if_shared_objects_failed():
+    planner = FakePlanner(fail_shared=True)
+    with pytest.raises(Exception, match='examples'):
+        DeploymentScheduler(FakeDeployer(planner)).run(plan_with_shared_database())
+    assert planner.calls == ['shared']
@@ -0,0 +1,71 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from SupersetApiClient import transport
+from SupersetApiClient.transport import RetryBudget, RetryingSession, RetryPolicy, TransportConfig
+
+
+def test_retry_budget_refills_over_time(monkeypatch):
+    now: list[float] = [1000.0]
+    monkeypatch.setattr(transport.time, 'monotonic', lambda: now[0])
+    budget = RetryBudget(2, 60.0)
+
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+    now[0] += 1.0
+    assert budget.spend()
+    assert not budget.spend()
+    # the refill is capped at the budget size
+    now[0] += 3600.0
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+
+
+class ScriptedAdapter(BaseAdapter):
+    def __init__(self, outcomes: list):
+        super().__init__()
+        self.outcomes = outcomes
+        self.sent: int = 0
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        outcome = self.outcomes[min(self.sent, len(self.outcomes) - 1)]
+        self.sent += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        status_code, headers = outcome
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers)
+        response.request = request
+        response._content = b''
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def session_with(outcomes: list) -> tuple[RetryingSession, ScriptedAdapter]:
+    config = TransportConfig(max_retries=2, backoff_max=0.0)
+    session = RetryingSession(config, RetryPolicy(config))
+    adapter = ScriptedAdapter(outcomes)
+    session.mount('http://', adapter)
+    return session, adapter
+
+
+@pytest.mark.parametrize('method, outcomes, sent', [
+    ('GET', [requests.ReadTimeout(), (200, {})], 2),
+    ('GET', [(502, {}), (200, {})], 2),
+    ('POST', [requests.ReadTimeout(), (200, {})], 1),
+    ('POST', [(502, {}), (200, {})], 1),
+    ('DELETE', [(503, {}), (200, {})], 1),
+    ('POST', [requests.ConnectionError(), (200, {})], 2),
+    ('POST', [(429, {'Retry-After': '0'}), (200, {})], 2),
+    ('DELETE', [(503, {'Retry-After': '0'}), (200, {})], 2),
+])
+def test_non_idempotent_requests_are_retried_only_if_not_processed(method, outcomes, sent):
+    session, adapter = session_with(outcomes)
+    try:
+        session.request(method, 'http://superset/api/v1/dashboard/')
+    except requests.RequestException:
+        pass
+    assert adapter.sent == sent